@@ -5,6 +5,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _choice(name: str, default: str, choices: tuple) -> str:
+    """Read a lower-cased setting from the environment, rejecting unknown values"""
+    value = os.getenv(name, default).lower()
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
 class Config:
     # LLM Settings
     USE_LOCAL_LLM = True  # Always true for free version
@@ -17,6 +26,18 @@ class Config:
     UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
     VECTOR_STORE_DIR = Path(os.getenv("VECTOR_STORE_DIR", "./vector_stores"))
 
+    # Keep per-document FAISS indexes in process memory instead of on disk (used by tests)
+    VECTOR_STORE_IN_MEMORY = os.getenv("VECTOR_STORE_IN_MEMORY", "false").lower() == "true"
+
+    # FAISS index for document vector stores: "flat" (exact scan) or "hnsw" (graph-based ANN).
+    # Files over 10MB are processed incrementally and always get a flat index
+    VECTOR_INDEX_TYPE = _choice("VECTOR_INDEX_TYPE", "flat", ("flat", "hnsw"))
+    HNSW_M = int(os.getenv("HNSW_M", 32))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 40))
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", 16))
+    # Scalar quantization of stored vectors: "none", "fp16" or "int8"
+    VECTOR_INDEX_QUANTIZATION = _choice("VECTOR_INDEX_QUANTIZATION", "none", ("none", "fp16", "int8"))
+
     # File constraints
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", 100))
     MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
@@ -1,7 +1,7 @@
 import os
 import hashlib
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Dict, NamedTuple
 import pickle
 import json
 import time
@@ -17,6 +17,8 @@ from langchain_community.document_loaders import (
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+import faiss
 import numpy as np
 
 from src.config import Config
@@ -24,6 +26,24 @@ from src.local_llm import OptimizedLLM
 from src.incremental_processor import IncrementalProcessor
 from src.security import validate_vector_store_path
 
+# Vector stores kept in memory when Config.VECTOR_STORE_IN_MEMORY is set, keyed by doc_id
+_memory_stores: Dict[str, FAISS] = {}
+
+# FAISS scalar quantizer types for Config.VECTOR_INDEX_QUANTIZATION
+SCALAR_QUANTIZERS = {
+    'fp16': faiss.ScalarQuantizer.QT_fp16,
+    'int8': faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+class ProcessResult(NamedTuple):
+    """Result of processing a single file"""
+    doc_id: str
+    pages: int
+    chunks: int
+    processing_time: float
+
+
 class DocumentProcessor:
     def __init__(self):
         self.config = Config()
@@ -106,7 +126,7 @@ class DocumentProcessor:
 
     def detect_file_type(self, filename: str) -> str:
         """Detect file type from filename extension"""
-        ext = filename.lower().split('.')[-1]
+        ext = filename.rpartition('.')[2].lower()
         
         # Map extensions to file types
         type_mapping = {
@@ -386,8 +406,11 @@ class DocumentProcessor:
         try:
             # Load and process the image
             with Image.open(file_path) as image:
-                # Extract text using OCR
-                extracted_text = pytesseract.image_to_string(image)
+                # Extract text using OCR. Give Tesseract the file itself unless there is an
+                # alpha channel to flatten: for an Image, pytesseract decodes it and
+                # re-encodes it to a temporary PNG before Tesseract decodes it again
+                ocr_input = image if 'A' in image.getbands() else file_path
+                extracted_text = pytesseract.image_to_string(ocr_input)
             
             # Clean up the extracted text
             lines = []
@@ -444,10 +467,14 @@ class DocumentProcessor:
     def generate_document_id(self, file_path: str) -> str:
         """Generate unique ID for document"""
         with open(file_path, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: hashes in C with the GIL released, without buffering the whole file
+                file_hash = hashlib.file_digest(f, 'sha256').hexdigest()
+            else:
+                file_hash = hashlib.sha256(f.read()).hexdigest()
         return file_hash[:16]
 
-    def process_file(self, file_path: str, filename: str, chunk_size: int = None, progress_callback: callable = None) -> Tuple[str, int, int, float]:
+    def process_file(self, file_path: str, filename: str, chunk_size: int = None, progress_callback: callable = None) -> ProcessResult:
         """Process any supported file type with optional dynamic chunk size"""
         # Ensure LLM is initialized for processing
         self._ensure_llm_initialized()
@@ -460,12 +487,12 @@ class DocumentProcessor:
         # Use incremental processing for large files
         if file_size > self.LARGE_FILE_THRESHOLD:
             print(f"Large file detected ({file_size / 1024 / 1024:.1f} MB), using incremental processing...")
-            return self.incremental_processor.process_file_incremental(
+            return ProcessResult(*self.incremental_processor.process_file_incremental(
                 file_path=file_path,
                 file_name=filename,
                 chunk_size=chunk_size,
                 progress_callback=progress_callback
-            )
+            ))
         
         # Regular processing for smaller files
         # Detect file type
@@ -551,15 +578,14 @@ class DocumentProcessor:
 
         # Create FAISS index
         print("Building vector index...")
-        vector_store = FAISS.from_embeddings(
-            text_embeddings=list(zip([c.page_content for c in chunks], all_embeddings)),
-            embedding=self.embeddings,
-            metadatas=[c.metadata for c in chunks]
-        )
+        vector_store = self._build_vector_store(chunks, all_embeddings)
 
         # Save vector store
-        vector_store_path = self.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
-        vector_store.save_local(str(vector_store_path))
+        if self.config.VECTOR_STORE_IN_MEMORY:
+            _memory_stores[doc_id] = vector_store
+        else:
+            vector_store_path = self.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
+            vector_store.save_local(str(vector_store_path))
 
         # Save metadata
         processing_time = time.time() - start_time
@@ -587,14 +613,51 @@ class DocumentProcessor:
         # Auto-cleanup old documents if needed
         self._cleanup_old_documents()
         
-        return doc_id, len(documents), len(chunks), processing_time
+        return ProcessResult(doc_id, len(documents), len(chunks), processing_time)
 
-    def process_pdf(self, file_path: str, filename: str) -> Tuple[str, int, int, float]:
+    def process_pdf(self, file_path: str, filename: str) -> ProcessResult:
         """Legacy method for backward compatibility - redirects to process_file"""
         return self.process_file(file_path, filename)
 
+    def _build_vector_store(self, chunks: List[Document], embeddings: List[List[float]]) -> FAISS:
+        """Build a FAISS store for the chunks using the configured index type"""
+        text_embeddings = list(zip([c.page_content for c in chunks], embeddings))
+        metadatas = [c.metadata for c in chunks]
+        quantizer = SCALAR_QUANTIZERS.get(self.config.VECTOR_INDEX_QUANTIZATION)
+        
+        if self.config.VECTOR_INDEX_TYPE != "hnsw" and quantizer is None:
+            return FAISS.from_embeddings(
+                text_embeddings=text_embeddings,
+                embedding=self.embeddings,
+                metadatas=metadatas
+            )
+        
+        dim = len(embeddings[0])
+        if self.config.VECTOR_INDEX_TYPE == "hnsw":
+            # HNSW answers queries by graph traversal instead of scanning every vector
+            if quantizer is None:
+                index = faiss.IndexHNSWFlat(dim, self.config.HNSW_M)
+            else:
+                index = faiss.IndexHNSWSQ(dim, quantizer, self.config.HNSW_M)
+            index.hnsw.efConstruction = self.config.HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.config.HNSW_EF_SEARCH
+        else:
+            # Store each component in 16 or 8 bits, halving or quartering what a scan reads
+            index = faiss.IndexScalarQuantizer(dim, quantizer, faiss.METRIC_L2)
+        
+        if not index.is_trained:
+            # 8-bit quantization learns per-dimension value ranges from the chunk vectors
+            index.train(np.asarray(embeddings, dtype='float32'))
+        
+        vector_store = FAISS(self.embeddings, index, InMemoryDocstore(), {})
+        vector_store.add_embeddings(text_embeddings, metadatas=metadatas)
+        return vector_store
+
     def load_vector_store(self, document_id: str) -> FAISS:
         """Load existing vector store"""
+        if self.config.VECTOR_STORE_IN_MEMORY and document_id in _memory_stores:
+            return _memory_stores[document_id]
+        
         vector_store_path = self.config.VECTOR_STORE_DIR / f"{document_id}.faiss"
         if not vector_store_path.exists():
             raise ValueError(f"Document {document_id} not found")
@@ -608,11 +671,17 @@ class DocumentProcessor:
 
         # Load with safer approach - still uses pickle internally but with validation
         # In production, consider migrating to a safer serialization format
-        return FAISS.load_local(
+        vector_store = FAISS.load_local(
             str(vector_store_path),
             embeddings,
             allow_dangerous_deserialization=True  # Required by FAISS, but path is validated
         )
+        
+        # Apply the current search breadth to HNSW indexes saved with older settings
+        if isinstance(vector_store.index, faiss.IndexHNSW):
+            vector_store.index.hnsw.efSearch = self.config.HNSW_EF_SEARCH
+        
+        return vector_store
     
     def _cleanup_old_documents(self):
         """Remove old documents to manage storage"""
@@ -636,6 +705,7 @@ class DocumentProcessor:
                     doc_id = metadata_file.stem
                     
                     # Remove vector store
+                    _memory_stores.pop(doc_id, None)
                     vector_store_path = self.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
                     if vector_store_path.exists():
                         import shutil
@@ -654,6 +724,7 @@ class DocumentProcessor:
                     doc_id = metadata_file.stem
                     
                     # Remove vector store
+                    _memory_stores.pop(doc_id, None)
                     vector_store_path = self.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
                     if vector_store_path.exists():
                         import shutil
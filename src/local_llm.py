@@ -1,6 +1,7 @@
 import os
-import json
+import orjson
 import time
+from functools import lru_cache
 from typing import Dict, List, Optional
 import ollama
 from langchain_community.llms import Ollama as LangchainOllama
@@ -9,6 +10,23 @@ from src.config import Config
 import torch
 from src.memory_safe_embeddings import MemorySafeEmbeddings
 
+MODEL_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "model_config.json")
+
+
+@lru_cache(maxsize=4)
+def _read_model_config(path: str, mtime_ns: int) -> Dict:
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def load_model_config(path: str = MODEL_CONFIG_PATH) -> Dict:
+    """Parsed model_config.json, shared between callers and re-read only when the file changes
+
+    Raises OSError if the file is missing. Treat the result as read-only.
+    """
+    return _read_model_config(path, os.stat(path).st_mtime_ns)
+
+
 class OptimizedLLM:
     def __init__(self, config: Config, model_name: Optional[str] = None):
         self.config = config
@@ -20,12 +38,9 @@ class OptimizedLLM:
 
     def _load_model_config(self) -> Dict:
         """Load model-specific configuration"""
-        config_path = os.path.join(os.path.dirname(__file__), "model_config.json")
-        
-        if os.path.exists(config_path):
+        if os.path.exists(MODEL_CONFIG_PATH):
             try:
-                with open(config_path, 'r') as f:
-                    return json.load(f)
+                return load_model_config()
             except Exception as e:
                 print(f"Warning: Could not load model config: {e}")
         
@@ -58,6 +58,12 @@ class RequestQueueManager:
         # Request handlers
         self._handlers = {}
         
+        # Set when each request finishes, so callers can block instead of polling
+        self._done_events = {}
+        
+        # Wakes the background processor when a request is queued or a slot frees up
+        self._wakeup = threading.Event()
+        
         # Start background processor
         self._running = True
         self._processor_thread = threading.Thread(target=self._process_queue)
@@ -90,6 +96,9 @@ class RequestQueueManager:
             if len(self._pending_queue) >= self.max_queue_size:
                 raise ValueError("Request queue is full")
             
+            with self._completed_lock:
+                self._done_events[request_id] = threading.Event()
+            
             # Insert based on priority
             inserted = False
             for i, req in enumerate(self._pending_queue):
@@ -101,6 +110,7 @@ class RequestQueueManager:
             if not inserted:
                 self._pending_queue.append(request)
         
+        self._wakeup.set()
         logger.info(f"Request {request_id} queued with priority {priority}")
         return request_id
     
@@ -124,6 +134,19 @@ class RequestQueueManager:
         
         return None
     
+    def wait_for_request(self, request_id: str, timeout: Optional[float] = None) -> Optional[Request]:
+        """Block until a request completes, fails or is cancelled, or the timeout expires
+        
+        Returns the request in whatever state it is in, or None if it is unknown.
+        """
+        with self._completed_lock:
+            done = self._done_events.get(request_id)
+        
+        if done:
+            done.wait(timeout)
+        
+        return self.get_request_status(request_id)
+    
     def get_queue_position(self, request_id: str) -> int:
         """Get position in queue (0 if not in queue)"""
         with self._queue_lock:
@@ -143,28 +166,33 @@ class RequestQueueManager:
                     # Use completed lock when accessing _completed
                     with self._completed_lock:
                         self._completed[request_id] = req
+                        self._done_events[request_id].set()
                     return True
         return False
     
     def _process_queue(self) -> None:
         """Background thread to process queue"""
         while self._running:
-            # Check if we can process more requests
-            with self._processing_lock:
-                processing_count = len(self._processing)
+            self._wakeup.clear()
             
-            if processing_count < self.max_concurrent:
-                # Get next request
-                request = None
-                with self._queue_lock:
-                    if self._pending_queue:
+            # Start as many requests as there are free slots
+            while True:
+                with self._processing_lock:
+                    if len(self._processing) >= self.max_concurrent:
+                        break
+                    
+                    with self._queue_lock:
+                        if not self._pending_queue:
+                            break
                         request = self._pending_queue.popleft()
+                    
+                    # Claim the slot now so it counts before the executor picks it up
+                    self._processing[request.id] = request
                 
-                if request:
-                    # Start processing
-                    self._executor.submit(self._process_request, request)
+                self._executor.submit(self._process_request, request)
             
-            time.sleep(0.1)  # Small delay to prevent busy waiting
+            # Sleep until a request is queued or finishes (timeout covers shutdown)
+            self._wakeup.wait(0.1)
     
     def _process_request(self, request: Request) -> None:
         """Process a single request"""
@@ -173,9 +201,6 @@ class RequestQueueManager:
             request.status = RequestStatus.PROCESSING
             request.started_at = time.time()
             
-            with self._processing_lock:
-                self._processing[request.id] = request
-            
             logger.info(f"Processing request {request.id} of type {request.type}")
             
             # Get handler
@@ -208,11 +233,18 @@ class RequestQueueManager:
             with self._completed_lock:
                 self._completed[request.id] = request
                 
-                # Clean old completed requests (keep last 100)
-                if len(self._completed) > 100:
-                    oldest_id = min(self._completed.keys(), 
-                                  key=lambda k: self._completed[k].completed_at)
-                    del self._completed[oldest_id]
+                try:
+                    # Clean old completed requests (keep last 100); cancelled
+                    # requests never got a completed_at, so they go first
+                    if len(self._completed) > 100:
+                        oldest_id = min(self._completed.keys(), 
+                                      key=lambda k: self._completed[k].completed_at or 0)
+                        del self._completed[oldest_id]
+                        self._done_events.pop(oldest_id, None)
+                finally:
+                    self._done_events[request.id].set()
+            
+            self._wakeup.set()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
@@ -245,6 +277,7 @@ class RequestQueueManager:
     def shutdown(self) -> None:
         """Shutdown the queue manager"""
         self._running = False
+        self._wakeup.set()
         self._processor_thread.join()
         self._executor.shutdown(wait=True)
 
@@ -260,23 +293,18 @@ def queue_request(request_type: str, data: Dict[str, Any], priority: int = 0) ->
 
 def get_request_result(request_id: str, timeout: float = 60) -> Any:
     """Wait for and get request result"""
-    start_time = time.time()
+    status = request_queue.wait_for_request(request_id, timeout)
     
-    while time.time() - start_time < timeout:
-        status = request_queue.get_request_status(request_id)
-        
-        if not status:
-            raise ValueError(f"Request {request_id} not found")
-        
-        if status.status == RequestStatus.COMPLETED:
-            return status.result
-        
-        if status.status == RequestStatus.FAILED:
-            raise Exception(f"Request failed: {status.error}")
-        
-        if status.status == RequestStatus.CANCELLED:
-            raise Exception("Request was cancelled")
-        
-        time.sleep(0.1)
+    if not status:
+        raise ValueError(f"Request {request_id} not found")
+    
+    if status.status == RequestStatus.COMPLETED:
+        return status.result
+    
+    if status.status == RequestStatus.FAILED:
+        raise Exception(f"Request failed: {status.error}")
+    
+    if status.status == RequestStatus.CANCELLED:
+        raise Exception("Request was cancelled")
     
     raise TimeoutError(f"Request {request_id} timed out after {timeout}s")
\ No newline at end of file
@@ -13,7 +13,7 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
 from src.config import Config
-from src.local_llm import OptimizedLLM
+from src.local_llm import OptimizedLLM, load_model_config
 from src.document_processor import DocumentProcessor
 from src.web_search import WebSearcher, SearchResult
 from src.memory_safe_embeddings import MemorySafeEmbeddings
@@ -107,8 +107,7 @@ class UnifiedQAChain:
         """Initialize model parameters from config"""
         self.model_params_file = Path(__file__).parent / "model_config.json"
         try:
-            with open(self.model_params_file, 'r') as f:
-                self.model_params = json.load(f)
+            self.model_params = load_model_config(str(self.model_params_file))
         except:
             self.model_params = {}
     
@@ -1,6 +1,6 @@
 """Improved session state management with user isolation"""
 import streamlit as st
-import json
+import orjson
 import os
 import time
 import uuid
@@ -79,16 +79,16 @@ class IsolatedSessionManager:
                         # Handle non-serializable objects
                         try:
                             # Test if serializable
-                            json.dumps(value)
+                            orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
                             state_to_save['data'][key] = value
-                        except (TypeError, ValueError):
+                        except TypeError:
                             # Convert to string if not serializable
                             state_to_save['data'][key] = str(value)
                 
                 # Write to user-specific file
                 session_file = self.get_session_file(session_id)
-                with open(session_file, 'w') as f:
-                    json.dump(state_to_save, f, indent=2)
+                with open(session_file, 'wb') as f:
+                    f.write(orjson.dumps(state_to_save, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
                 
                 logger.debug(f"Saved session state for {session_id}")
                 
@@ -106,8 +106,8 @@ class IsolatedSessionManager:
         try:
             if session_file.exists():
                 with self._lock:
-                    with open(session_file, 'r') as f:
-                        saved_state = json.load(f)
+                    with open(session_file, 'rb') as f:
+                        saved_state = orjson.loads(f.read())
                     
                     # Check if session is still valid
                     if time.time() - saved_state['timestamp'] > self.session_timeout:
@@ -200,8 +200,8 @@ class IsolatedSessionManager:
         """Migrate from old session format to new isolated format"""
         try:
             if old_session_file.exists():
-                with open(old_session_file, 'r') as f:
-                    old_state = json.load(f)
+                with open(old_session_file, 'rb') as f:
+                    old_state = orjson.loads(f.read())
                 
                 # Import into current session
                 for key, value in old_state.items():
@@ -3,11 +3,11 @@ import logging
 import time
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, quote_plus
-import hashlib
 import json
 
 
@@ -32,9 +32,11 @@ class SearchResult:
 class WebSearcher:
     """Handles web search and content extraction"""
     
-    def __init__(self, cache_ttl_minutes: int = 15):
+    def __init__(self, cache_ttl_minutes: int = 15, max_cache_size: int = 100):
         self.cache_ttl = timedelta(minutes=cache_ttl_minutes)
-        self.cache = {}
+        # LRU order: least recently used entry first
+        self.cache = OrderedDict()
+        self.max_cache_size = max_cache_size
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
@@ -165,25 +167,31 @@ class WebSearcher:
         
     def _get_cache_key(self, query: str, num_results: int) -> str:
         """Generate cache key for a search query"""
-        key_string = f"{query}:{num_results}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # The cache is an in-process dict, so the plain string is hashed on lookup anyway
+        return f"{query}:{num_results}"
         
     def _get_from_cache(self, key: str) -> Optional[List[SearchResult]]:
         """Get results from cache if not expired"""
-        if key in self.cache:
-            cached_data = self.cache[key]
-            if datetime.now() - cached_data['timestamp'] < self.cache_ttl:
-                return cached_data['results']
-            else:
-                del self.cache[key]
-        return None
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        results, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self.cache[key]
+            return None
+        # Move to end (most recently used)
+        self.cache.move_to_end(key)
+        return results
         
     def _add_to_cache(self, key: str, results: List[SearchResult]) -> None:
         """Add results to cache"""
-        self.cache[key] = {
-            'results': results,
-            'timestamp': datetime.now()
-        }
+        # Remove oldest item if cache is full
+        if len(self.cache) >= self.max_cache_size and key not in self.cache:
+            self.cache.popitem(last=False)
+        
+        # Entries are (results, monotonic expiry time)
+        self.cache[key] = (results, time.monotonic() + self.cache_ttl.total_seconds())
+        self.cache.move_to_end(key)
         
     def clear_cache(self) -> None:
         """Clear the cache"""
@@ -14,6 +14,10 @@ IS_CI = os.getenv("CI", "false").lower() == "true"
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080")
 STREAMLIT_URL = os.getenv("STREAMLIT_URL", "http://localhost:2402")
 
+# Set GREG_TEST_EMB_CACHE=1 to reuse chunk embeddings across test runs
+USE_EMBEDDING_CACHE = os.getenv("GREG_TEST_EMB_CACHE", "").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_DIR = Path.home() / ".cache" / "greg-tests" / "emb"
+
 
 @pytest.fixture(scope="session")
 def api_url() -> str:
@@ -70,6 +74,37 @@ def ensure_services():
     yield
 
 
+@pytest.fixture(autouse=True, scope="session")
+def embedding_cache():
+    """Serve document embeddings from an on-disk cache when GREG_TEST_EMB_CACHE is set
+    
+    Wraps the embeddings handed out by OptimizedLLM, which is what
+    DocumentProcessor uses to embed chunks, so warm runs skip the model entirely.
+    """
+    if not USE_EMBEDDING_CACHE:
+        yield
+        return
+    
+    from src.local_llm import OptimizedLLM
+    from tests.embedding_cache import CachedEmbeddings
+    
+    original_get_embeddings = OptimizedLLM.get_embeddings
+    
+    def get_cached_embeddings(self):
+        if not isinstance(self.embeddings, CachedEmbeddings):
+            self.embeddings = CachedEmbeddings(
+                original_get_embeddings(self),
+                self.config.EMBEDDING_MODEL,
+                EMBEDDING_CACHE_DIR
+            )
+        return self.embeddings
+    
+    patcher = pytest.MonkeyPatch()
+    patcher.setattr(OptimizedLLM, "get_embeddings", get_cached_embeddings)
+    yield
+    patcher.undo()
+
+
 @pytest.fixture(scope="function")
 def test_file_factory(tmp_path) -> Generator:
     """Factory for creating test files"""
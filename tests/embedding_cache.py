@@ -0,0 +1,74 @@
+"""
+On-disk embedding cache used by the test suite (see GREG_TEST_EMB_CACHE in conftest.py)
+"""
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from pathlib import Path
+from typing import List, Dict
+from langchain_core.embeddings import Embeddings
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that persists document vectors in SQLite, keyed by
+    (model name, sha256 of the chunk text), so repeated test runs only embed
+    chunks they have never seen. Vectors are stored as float32 blobs.
+    """
+    
+    def __init__(self, base_embeddings: Embeddings, model_name: str, cache_dir: Path):
+        self.base_embeddings = base_embeddings
+        self.model_name = model_name
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Processing fixtures may embed from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(cache_dir / "embeddings.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(model TEXT, key TEXT, vector BLOB, PRIMARY KEY (model, key))"
+        )
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, serving previously seen chunks from the cache"""
+        keys = [hashlib.sha256(text.encode('utf-8')).hexdigest() for text in texts]
+        vectors = self._lookup(list(dict.fromkeys(keys)))
+        
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if misses:
+            new_vectors = self.base_embeddings.embed_documents(list(misses.values()))
+            rows = [
+                (self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes())
+                for key, vector in zip(misses, new_vectors)
+            ]
+            with self._lock:
+                self._db.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)", rows)
+                self._db.commit()
+            vectors.update(zip(misses, new_vectors))
+        
+        return [list(vectors[key]) for key in keys]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Queries are cheap and vary per test, so they are not cached"""
+        return self.base_embeddings.embed_query(text)
+    
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys in batches"""
+        found = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+    
+    def __getattr__(self, name):
+        """Proxy other attributes to base embeddings"""
+        if name == 'base_embeddings':
+            raise AttributeError(name)
+        return getattr(self.base_embeddings, name)
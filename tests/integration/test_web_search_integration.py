@@ -6,10 +6,6 @@ import subprocess
 from pathlib import Path
 import sys
 
-# Add project root to path
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
 
 class TestWebSearchIntegration:
     """Test web search integration with backend"""
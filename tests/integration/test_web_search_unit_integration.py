@@ -1,67 +1,87 @@
 """Test web search integration with QA chain"""
 import pytest
-import sys
-import os
-from pathlib import Path
-
-# Add project root to path
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+from unittest.mock import Mock, patch
 
 from src.qa_chain_unified import UnifiedQAChain
 from src.web_search import WebSearcher, SearchResult
 
 
-def test_enhanced_qa_chain_initialization():
+@pytest.fixture(scope="module")
+def chain():
+    """One UnifiedQAChain for the module, so its lazily loaded LLM and embeddings are reused"""
+    return UnifiedQAChain()
+
+
+@pytest.fixture(autouse=True)
+def clear_web_cache(chain):
+    """Start every test with an empty web search cache"""
+    chain.web_searcher.clear_cache()
+
+
+def test_enhanced_qa_chain_initialization(chain):
     """Test that enhanced QA chain initializes properly"""
-    chain = UnifiedQAChain()
     assert chain.web_searcher is not None
     assert isinstance(chain.web_searcher, WebSearcher)
 
 
-def test_web_only_search():
-    """Test web-only search functionality"""
-    chain = UnifiedQAChain()
+def test_web_only_search(chain):
+    """Test web-only search functionality with the web search and LLM stubbed out"""
+    web_results = [
+        SearchResult(
+            title="Python 3.13 released",
+            url="https://example.com/python-3-13",
+            snippet="Python 3.13 is out",
+            content="Python 3.13 is the latest stable release of Python."
+        )
+    ]
+    llm = Mock()
+    llm.invoke.return_value = "The latest release is Python 3.13."
     
-    # Test with a simple query
-    result = chain.answer_question_with_web(
-        question="What is Python programming language?",
-        document_id="web_only",
-        use_web=True,
-        max_results=3,
-        model_name="mistral",
-        temperature=0.7
-    )
+    # "latest" routes the question to web search
+    with patch.object(chain.web_searcher, 'search', return_value=web_results) as mock_search, \
+         patch.object(chain, '_get_llm', return_value=llm):
+        result = chain.answer_question(
+            question="What is the latest Python release?",
+            document_id="web_only",
+            use_web=True,
+            max_results=3,
+            model_name="mistral",
+            temperature=0.7,
+            streaming=False
+        )
     
+    mock_search.assert_called_once()
     assert 'answer' in result
     assert 'sources' in result
     assert result['document_id'] == 'web_only'
     assert result.get('used_web_search', False) == True
-    assert '🌐' in result['answer']  # Should have web indicator
+    assert result['answer'] == "The latest release is Python 3.13."
+    # The page content reached the prompt, and the page is cited
+    assert "latest stable release" in llm.invoke.call_args[0][0]
+    assert result['sources'][0]['source'] == "https://example.com/python-3-13"
+    assert result['sources'][0]['type'] == 'web'
 
 
 
 
-def test_web_search_formatting():
+def test_web_search_formatting(chain):
     """Test that web search results are properly formatted"""
-    chain = WebSearchQAChain()
-    
     # Create mock search results
     from langchain.schema import Document
     
     web_doc = Document(
         page_content="Test web content",
         metadata={
-            "source": "web",
-            "url": "https://example.com",
+            "source": "https://example.com",
             "title": "Example Page",
-            "search_rank": 1
+            "source_type": "web"
         }
     )
     
     doc_doc = Document(
         page_content="Test document content",
         metadata={
+            "source": "test_invoice.pdf",
             "page": 1,
             "chunk_index": 0
         }
@@ -71,15 +91,14 @@ def test_web_search_formatting():
     
     assert len(sources) == 2
     assert sources[0]['type'] == 'web'
-    assert sources[0]['url'] == 'https://example.com'
+    assert sources[0]['source'] == 'https://example.com'
+    assert sources[0]['title'] == 'Example Page'
     assert sources[1]['type'] == 'document'
-    assert sources[1]['page'] == 1
+    assert sources[1]['source'] == 'test_invoice.pdf'
 
 
-def test_search_web_for_context():
+def test_search_web_for_context(chain):
     """Test web search context creation"""
-    chain = WebSearchQAChain()
-    
     # Test search for context
     docs = chain._search_web_for_context("Python programming", num_results=2)
     
@@ -89,7 +108,7 @@ def test_search_web_for_context():
     if docs:  # If search returns results
         assert all(hasattr(doc, 'page_content') for doc in docs)
         assert all(hasattr(doc, 'metadata') for doc in docs)
-        assert all(doc.metadata.get('source') == 'web' for doc in docs)
+        assert all(doc.metadata.get('source_type') == 'web' for doc in docs)
 
 
 if __name__ == "__main__":
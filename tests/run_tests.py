@@ -132,6 +132,13 @@ class TestRunner:
         elif self.args.suite == "streamlit":
             suites["Streamlit"] = base_args + ["tests/streamlit/"]
         
+        # Spread unit test files across CPU cores. loadfile keeps every module
+        # on a single worker so module-scoped processor/embedding fixtures are
+        # still built only once per file.
+        if self.args.xdist and "Unit" in suites:
+            workers = str(self.args.workers) if self.args.workers else "auto"
+            suites["Unit"].extend(["-n", workers, "--dist=loadfile"])
+        
         # Add coverage if requested
         if self.args.coverage:
             for suite in suites.values():
@@ -232,8 +239,14 @@ def main():
     parser.add_argument(
         "--workers",
         type=int,
-        default=multiprocessing.cpu_count(),
-        help="Number of parallel workers"
+        default=None,
+        help="Number of parallel workers (default: one per CPU core)"
+    )
+    
+    parser.add_argument(
+        "--xdist",
+        action="store_true",
+        help="Run unit test files in parallel with pytest-xdist"
     )
     
     parser.add_argument(
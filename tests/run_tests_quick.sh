@@ -22,7 +22,7 @@ ALL_PASSED=true
 # Run unit tests
 echo "1️⃣  Running Unit Tests..."
 echo "========================"
-if ./venv/bin/python -m pytest tests/unit/ -v --tb=short; then
+if ./venv/bin/python -m pytest tests/unit/ -v --tb=short -n auto --dist=loadfile; then
     echo "✅ Unit tests passed"
 else
     echo "❌ Unit tests failed"
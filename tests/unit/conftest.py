@@ -0,0 +1,229 @@
+"""Shared fixtures for unit tests"""
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import pytest
+from pathlib import Path
+
+# Under xdist, run Tesseract (and any other OpenMP code) single-threaded in each
+# worker: its OpenMP threading only adds spawn/join overhead on single-page images,
+# and the workers already keep every core busy
+if os.getenv("PYTEST_XDIST_WORKER"):
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+# RAM-backed directory for unit-test uploads/vector stores, used only when it has
+# at least TEST_TMPFS_MIN_FREE_MB free (Docker's default /dev/shm is 64MB)
+TEST_TMPFS_DIR = os.getenv("TEST_TMPFS_DIR", "/dev/shm")
+TEST_TMPFS_MIN_FREE_MB = int(os.getenv("TEST_TMPFS_MIN_FREE_MB", 1024))
+
+# Fixture documents processed once per session (and across runs with the fixture cache)
+PRECOMPUTED_FIXTURES = [
+    "test_invoice.txt",
+    "test_invoice.csv",
+    "test_invoice.xlsx",
+    "test_story.xlsx",
+]
+
+# Optional embedding model for the unit-test processor, e.g. a smaller one than
+# production. Those tests only check that expected text shows up in the top-k
+# results; production embedding fidelity is covered by the API/integration tests
+TEST_EMBEDDING_MODEL = os.getenv("TEST_EMBEDDING_MODEL")
+
+# Keep vector stores built by unit tests in memory rather than serialising each
+# one to disk; set VECTOR_STORE_IN_MEMORY=false to exercise save/load as well
+KEEP_STORES_IN_MEMORY = os.getenv("VECTOR_STORE_IN_MEMORY", "true").lower() == "true"
+
+# Set GREG_TEST_OCR_CACHE=1 to reuse OCR output for fixture images across runs;
+# it is off by default so the suite keeps exercising Tesseract
+USE_OCR_CACHE = os.getenv("GREG_TEST_OCR_CACHE", "").lower() in ("1", "true", "yes")
+OCR_CACHE_DIR = Path.home() / ".cache" / "greg-tests" / "ocr"
+
+# Set GREG_TEST_FIXTURE_CACHE=1 to reuse processed fixture documents across runs;
+# it is off by default so the loaders and embeddings are exercised on every run
+USE_FIXTURE_CACHE = os.getenv("GREG_TEST_FIXTURE_CACHE", "").lower() in ("1", "true", "yes")
+FIXTURE_CACHE_DIR = Path(os.getenv("GREG_FIXTURE_CACHE", Path.home() / ".cache" / "greg-tests" / "fixtures"))
+
+
+def pytest_configure(config):
+    """Put temp directories on tmpfs for unit-only runs, when it has room"""
+    # Only when every requested path is in the unit suite, so integration runs and
+    # the servers they start keep using the normal temp dir
+    unit_dir = Path(__file__).parent.resolve()
+    requested = [
+        (config.invocation_params.dir / arg.split("::")[0]).resolve() for arg in config.args
+    ]
+    if not requested or not all(path == unit_dir or unit_dir in path.parents for path in requested):
+        return
+
+    if not (os.path.isdir(TEST_TMPFS_DIR) and os.access(TEST_TMPFS_DIR, os.W_OK)):
+        return
+    if shutil.disk_usage(TEST_TMPFS_DIR).free < TEST_TMPFS_MIN_FREE_MB * 1024 * 1024:
+        return
+
+    # tmp_path/tmp_path_factory and tempfile.mkdtemp() then create upload and
+    # vector store directories in RAM
+    tempfile.tempdir = TEST_TMPFS_DIR
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cached_ocr():
+    """Serve pytesseract.image_to_string from an on-disk cache when GREG_TEST_OCR_CACHE is set
+
+    Each fixture image is OCR'd once instead of by every test that processes it.
+    Clear the cache after upgrading Tesseract.
+    """
+    if not USE_OCR_CACHE:
+        yield
+        return
+    
+    try:
+        import pytesseract
+    except ImportError:
+        yield
+        return
+    
+    original_image_to_string = pytesseract.image_to_string
+    OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    
+    def image_to_string(image, *args, **kwargs):
+        # The processor passes a file path, or a PIL image when it has to flatten alpha
+        if isinstance(image, str):
+            key = hashlib.sha1(Path(image).read_bytes())
+        else:
+            key = hashlib.sha1(image.tobytes())
+            key.update(f"{image.mode}{image.size}".encode('utf-8'))
+        key.update(f"{args}{sorted(kwargs.items())}".encode('utf-8'))
+        cached = OCR_CACHE_DIR / f"{key.hexdigest()}.txt"
+        if cached.exists():
+            return cached.read_text(encoding='utf-8')
+        
+        text = original_image_to_string(image, *args, **kwargs)
+        # Write then rename so parallel workers never read a partial file
+        partial = cached.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_text(text, encoding='utf-8')
+        os.replace(partial, cached)
+        return text
+    
+    patcher = pytest.MonkeyPatch()
+    patcher.setattr(pytesseract, "image_to_string", image_to_string)
+    yield
+    patcher.undo()
+
+
+@pytest.fixture(scope="session")
+def processor(tmp_path_factory):
+    """One DocumentProcessor for the whole session, writing to temp directories
+
+    The embedding model is loaded lazily on first use and then reused by every
+    test module instead of once per test class. Auto-cleanup is disabled on this
+    instance, since every module's stores share one directory for the session.
+    """
+    from src.document_processor import DocumentProcessor
+
+    processor = DocumentProcessor()
+    processor.config.UPLOAD_DIR = tmp_path_factory.mktemp("upload")
+    processor.config.VECTOR_STORE_DIR = tmp_path_factory.mktemp("vectors")
+    processor.config.VECTOR_STORE_IN_MEMORY = KEEP_STORES_IN_MEMORY
+    if TEST_EMBEDDING_MODEL:
+        processor.config.EMBEDDING_MODEL = TEST_EMBEDDING_MODEL
+    processor._cleanup_old_documents = lambda: None
+    return processor
+
+
+@pytest.fixture(scope="session")
+def fixtures_dir():
+    """Directory holding the fixture documents"""
+    return Path(__file__).parent.parent / "fixtures"
+
+
+@pytest.fixture(scope="session")
+def precomputed_docs(processor, fixtures_dir):
+    """ProcessResult for each of PRECOMPUTED_FIXTURES, keyed by filename
+
+    Each fixture is processed once per session. With GREG_TEST_FIXTURE_CACHE set,
+    vector stores and metadata are also cached under GREG_FIXTURE_CACHE and linked
+    into the processor's vector store directory, so warm runs skip processing.
+    Entries are keyed by the embedding, chunking and index settings and by the
+    source of src/document_processor.py; clear the cache after upgrading
+    langchain, pandas/openpyxl or the embedding stack.
+    """
+    from src import document_processor
+    from src.document_processor import ProcessResult
+
+    if not USE_FIXTURE_CACHE:
+        return {
+            name: processor.process_file(str(fixtures_dir / name), name)
+            for name in PRECOMPUTED_FIXTURES
+        }
+
+    config = processor.config
+    settings = (
+        f"{config.EMBEDDING_MODEL}-{config.CHUNK_SIZE}-{config.CHUNK_OVERLAP}"
+        f"-{config.VECTOR_INDEX_TYPE}-{config.VECTOR_INDEX_QUANTIZATION}"
+        f"-{config.HNSW_M}-{config.HNSW_EF_CONSTRUCTION}"
+    )
+    loader_hash = hashlib.sha1(Path(document_processor.__file__).read_bytes()).hexdigest()[:12]
+    cache_key = f"{settings}-{loader_hash}".replace("/", "_")
+    cache_dir = FIXTURE_CACHE_DIR / cache_key
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for name in PRECOMPUTED_FIXTURES:
+        file_path = str(fixtures_dir / name)
+        doc_id = processor.generate_document_id(file_path)
+        cached = cache_dir / doc_id
+
+        if not cached.exists():
+            processor.process_file(file_path, name)
+            _store_in_cache(processor, doc_id, cached)
+
+        shutil.copytree(
+            cached / f"{doc_id}.faiss",
+            config.VECTOR_STORE_DIR / f"{doc_id}.faiss",
+            copy_function=_link_or_copy,
+            dirs_exist_ok=True
+        )
+        # Copy rather than link: cleanup ages documents by their metadata mtime,
+        # which has to be this session's, not the cache entry's
+        shutil.copyfile(cached / f"{doc_id}.metadata", config.VECTOR_STORE_DIR / f"{doc_id}.metadata")
+
+        metadata = json.loads((cached / f"{doc_id}.metadata").read_text())
+        results[name] = ProcessResult(doc_id, metadata['pages'], metadata['chunks'], metadata['processing_time'])
+
+    return results
+
+
+def _link_or_copy(src, dst):
+    """Hard-link a cached file into place, copying when that isn't possible
+
+    Tests only read the indexes, and removing a document just unlinks its
+    directory entries, so sharing the cache's inodes is safe and skips copying
+    the index bytes every session.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if not os.path.samefile(src, dst):
+            shutil.copy2(src, dst)
+    except OSError:
+        # Cache and temp directories are on different filesystems
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _store_in_cache(processor, doc_id, cached):
+    """Save a freshly processed document's vector store and metadata to the cache"""
+    # Build next to the target and rename into place, so a concurrent xdist worker
+    # never sees a half-written entry
+    staging = Path(tempfile.mkdtemp(prefix=f".{doc_id}-", dir=cached.parent))
+    processor.load_vector_store(doc_id).save_local(str(staging / f"{doc_id}.faiss"))
+    shutil.copy2(processor.config.VECTOR_STORE_DIR / f"{doc_id}.metadata", staging / f"{doc_id}.metadata")
+
+    try:
+        staging.rename(cached)
+    except OSError:
+        # Another worker got there first
+        shutil.rmtree(staging, ignore_errors=True)
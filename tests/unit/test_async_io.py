@@ -4,6 +4,7 @@ import asyncio
 import json
 from pathlib import Path
 import tempfile
+from datetime import datetime
 
 from src.async_io import (
     read_file_async, write_file_async, hash_file_async,
@@ -95,6 +96,25 @@ async def test_json_operations():
         temp_path.unlink()
 
 
+@pytest.mark.asyncio
+async def test_json_compatibility_with_json_module(tmp_path):
+    """JSON written by the json module loads, and datetimes save as json.dumps would"""
+    # json.dump writes NaN/Infinity by default, which isn't standard JSON
+    legacy_path = tmp_path / "legacy.metadata"
+    legacy_path.write_text(json.dumps({"score": float("nan"), "limit": float("inf")}))
+    
+    loaded = await load_json_async(legacy_path)
+    assert loaded["score"] != loaded["score"]
+    assert loaded["limit"] == float("inf")
+    
+    # Datetimes keep the str() format; non-finite floats become null
+    upload_date = datetime(2025, 1, 15, 9, 30)
+    saved_path = tmp_path / "saved.metadata"
+    await save_json_async(saved_path, {"upload_date": upload_date, "score": float("nan")})
+    
+    assert await load_json_async(saved_path) == {"upload_date": str(upload_date), "score": None}
+
+
 @pytest.mark.asyncio
 async def test_file_exists():
     """Test async file existence check"""
@@ -156,64 +176,66 @@ async def test_stream_file():
 
 
 @pytest.mark.asyncio
-async def test_process_files_batch():
+async def test_stream_file_mmap(tmp_path):
+    """Test async file streaming through the memory-mapped path"""
+    temp_path = tmp_path / "mapped.bin"
+    # Uneven size so the last chunk is short
+    test_data = bytes(range(256)) * 40 + b"tail"
+    temp_path.write_bytes(test_data)
+    
+    chunks = []
+    async for chunk in stream_file_async(temp_path, chunk_size=1024, mmap_threshold=0):
+        chunks.append(chunk)
+    
+    assert len(chunks) == 11
+    assert all(len(chunk) == 1024 for chunk in chunks[:-1])
+    assert b"".join(chunks) == test_data
+
+
+@pytest.mark.asyncio
+async def test_process_files_batch(tmp_path):
     """Test batch file processing"""
     # Create test files
-    temp_dir = Path(tempfile.mkdtemp())
     test_files = []
+    for i in range(5):
+        file_path = tmp_path / f"test_{i}.txt"
+        file_path.write_text(f"Content {i}")
+        test_files.append(file_path)
     
-    try:
-        for i in range(5):
-            file_path = temp_dir / f"test_{i}.txt"
-            file_path.write_text(f"Content {i}")
-            test_files.append(file_path)
-        
-        # Process files
-        async def process_file(path):
-            content = await read_file_async(path)
-            return content.upper()
-        
-        results = await process_files_batch_async(
-            test_files,
-            process_file,
-            max_concurrent=3
-        )
-        
-        # Verify results
-        assert len(results) == 5
-        for i, result in enumerate(results):
-            assert result == f"CONTENT {i}"
-        
-    finally:
-        # Cleanup
-        for file_path in test_files:
-            if file_path.exists():
-                file_path.unlink()
-        temp_dir.rmdir()
+    # Process files
+    async def process_file(path):
+        content = await read_file_async(path)
+        return content.upper()
+    
+    results = await process_files_batch_async(
+        test_files,
+        process_file,
+        max_concurrent=3
+    )
+    
+    # Verify results
+    assert len(results) == 5
+    for i, result in enumerate(results):
+        assert result == f"CONTENT {i}"
 
 
 @pytest.mark.asyncio
-async def test_concurrent_file_operations():
+async def test_concurrent_file_operations(tmp_path):
     """Test concurrent file operations don't interfere"""
-    temp_dir = Path(tempfile.mkdtemp())
+    file_count = 10
     
-    try:
-        # Create multiple files concurrently
-        async def create_file(i):
-            path = temp_dir / f"concurrent_{i}.txt"
-            await write_file_async(path, f"File {i} content")
-            return path
-        
-        # Create 10 files concurrently
-        paths = await asyncio.gather(*[create_file(i) for i in range(10)])
-        
-        # Verify all files exist and have correct content
-        for i, path in enumerate(paths):
-            content = await read_file_async(path)
-            assert content == f"File {i} content"
-        
-    finally:
-        # Cleanup
-        for file in temp_dir.glob("*"):
-            file.unlink()
-        temp_dir.rmdir()
\ No newline at end of file
+    # Preformat paths and payloads so the gather only schedules writes
+    paths = [tmp_path / f"concurrent_{i}.txt" for i in range(file_count)]
+    payloads = [f"File {i} content".encode() for i in range(file_count)]
+    
+    async def create_file(path, payload):
+        await write_file_async(path, payload, mode='wb')
+        return path
+    
+    # Create all files concurrently
+    await asyncio.gather(*[create_file(p, b) for p, b in zip(paths, payloads)])
+    
+    # Verify all files exist and have correct content
+    for path, payload in zip(paths, payloads):
+        content = await read_file_async(path, mode='rb')
+        assert content == payload
@@ -4,100 +4,66 @@ Test suite for content image processing (.png, .jpg) in Greg
 Tests visual content analysis and image understanding (not OCR)
 """
 
-import os
-import sys
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.document_processor import ProcessResult
+from tests.utils import batch_similarity_search
 
-from src.document_processor import DocumentProcessor
-from src.config import Config
 
 class TestContentImageProcessing:
     """Test document processing for visual content image files"""
     
-    @pytest.fixture
-    def setup(self):
-        """Setup test environment"""
-        # Create temp directories for testing
-        self.temp_upload = tempfile.mkdtemp()
-        self.temp_vectors = tempfile.mkdtemp()
-        
-        # Create config and override paths
-        self.config = Config()
-        self.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        # Create processor with modified config
-        self.processor = DocumentProcessor()
-        self.processor.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.processor.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        self.test_files_dir = Path(__file__).parent.parent / "fixtures"
-        
-        yield
-        
-        # Cleanup
-        shutil.rmtree(self.temp_upload, ignore_errors=True)
-        shutil.rmtree(self.temp_vectors, ignore_errors=True)
+    @pytest.fixture(scope="class")
+    def processed_content(self, processor, fixtures_dir):
+        """Run both content fixtures through the OCR/embedding pipeline once per class
+        
+        The processor is shared and process_file isn't thread-safe, so they run in turn.
+        """
+        return {
+            name: processor.process_file(str(fixtures_dir / name), name)
+            for name in ["test_content.png", "test_content.jpg"]
+        }
+    
+    @pytest.fixture(scope="class")
+    def processed_png(self, processed_content):
+        """Processing result for the PNG fixture"""
+        return processed_content["test_content.png"]
     
-    def test_png_content_processing(self, setup):
-        """Test processing of PNG content image"""
-        png_file = self.test_files_dir / "test_content.png"
+    @pytest.fixture(scope="class")
+    def processed_jpg(self, processed_content):
+        """Processing result for the JPG fixture"""
+        return processed_content["test_content.jpg"]
+    
+    def _assert_processed(self, processor, doc_id):
+        """Check that a processed image left a loadable, searchable vector store"""
+        assert processor.load_vector_store(doc_id) is not None
         
-        # Test that we can process a PNG content file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(png_file), 
-            "test_content.png"
-        )
+        # Test basic search functionality
+        vector_store = processor.load_vector_store(doc_id)
+        results = vector_store.similarity_search("image", k=3)
+        assert len(results) > 0
+    
+    @pytest.mark.parametrize("fixture_name", ["test_content.png", "test_content.jpg"])
+    def test_content_processing(self, processor, processed_content, fixture_name):
+        """Test processing of PNG and JPG content images"""
+        result = processed_content[fixture_name]
+        doc_id, pages, chunks, processing_time = result
         
         # Assertions
+        assert isinstance(result, ProcessResult)
         assert doc_id is not None
         assert len(doc_id) == 16  # Hash-based ID
         assert pages >= 1  # At least one "page" for images
         assert chunks > 0
         assert processing_time > 0
         
-        # Verify vector store was created
-        vector_store_path = self.processor.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
-        assert vector_store_path.exists()
-    
-    def test_jpg_content_processing(self, setup):
-        """Test processing of JPG content image"""
-        jpg_file = self.test_files_dir / "test_content.jpg"
-        
-        # Test that we can process a JPG content file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(jpg_file), 
-            "test_content.jpg"
-        )
-        
-        # Assertions
-        assert doc_id is not None
-        assert chunks > 0
-        assert processing_time > 0
-        
-        # Verify vector store was created
-        vector_store = self.processor.load_vector_store(doc_id)
-        
-        # Test basic search functionality
-        results = vector_store.similarity_search("image", k=3)
-        assert len(results) > 0
+        self._assert_processed(processor, doc_id)
     
-    def test_visual_content_description(self, setup):
+    def test_visual_content_description(self, processor, processed_png):
         """Test that visual content gets some form of description"""
-        png_file = self.test_files_dir / "test_content.png"
+        doc_id = processed_png.doc_id
         
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_content.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Since this is a visual image with no text, OCR should return minimal content
         # But the system should still create a searchable document
@@ -114,18 +80,13 @@ class TestContentImageProcessing:
         has_image_keyword = any(keyword in content_lower for keyword in image_keywords)
         assert has_image_keyword, f"Content should contain image-related keywords: {content}"
     
-    def test_animal_content_queries(self, setup):
+    def test_animal_content_queries(self, processor, processed_png):
         """Test queries about the animal in the image"""
         # Note: Since we only have OCR currently, these tests expect basic functionality
         # When vision models are added, these can be enhanced for actual visual recognition
-        png_file = self.test_files_dir / "test_content.png"
+        doc_id = processed_png.doc_id
         
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_content.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Basic queries that should work with current implementation
         basic_queries = [
@@ -134,25 +95,23 @@ class TestContentImageProcessing:
             ("Visual content", "content"),
         ]
         
-        for query, expected in basic_queries:
-            results = vector_store.similarity_search(query, k=3)
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in basic_queries], k=3
+        )
+        
+        for (query, expected), results in zip(basic_queries, batch_results):
             assert len(results) > 0, f"Should return results for query: {query}"
             
             # Basic content check
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Should find '{expected}' for query '{query}'"
     
-    def test_visual_analysis_placeholder(self, setup):
+    def test_visual_analysis_placeholder(self, processor, processed_jpg):
         """Placeholder test for future vision model integration"""
         # This test documents what we want to achieve with vision models
-        jpg_file = self.test_files_dir / "test_content.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_content.jpg"
-        )
+        doc_id = processed_jpg.doc_id
         
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # For now, just test that the image is processed
         results = vector_store.similarity_search("image analysis", k=3)
@@ -170,16 +129,11 @@ class TestContentImageProcessing:
         content = results[0].page_content
         assert "image" in content.lower() or "content" in content.lower()
     
-    def test_content_metadata_preservation(self, setup):
+    def test_content_metadata_preservation(self, processor, processed_png):
         """Test that content image metadata is preserved"""
-        png_file = self.test_files_dir / "test_content.png"
+        doc_id = processed_png.doc_id
         
-        doc_id, _, chunks, _ = self.processor.process_file(
-            str(png_file), 
-            "test_content.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Get a sample result
         results = vector_store.similarity_search("image", k=1)
@@ -195,26 +149,19 @@ class TestContentImageProcessing:
         # Should indicate the extraction method
         assert 'extraction_method' in metadata
     
-    def test_content_format_consistency(self, setup):
+    def test_content_format_consistency(self, processor, processed_content):
         """Test that PNG and JPG content formats are processed consistently"""
-        png_file = self.test_files_dir / "test_content.png"
-        jpg_file = self.test_files_dir / "test_content.jpg"
-        
-        # Process both formats
-        png_doc_id, _, png_chunks, _ = self.processor.process_file(
-            str(png_file), "test_content.png"
-        )
-        jpg_doc_id, _, jpg_chunks, _ = self.processor.process_file(
-            str(jpg_file), "test_content.jpg"
-        )
+        # Both formats were processed side by side by the class fixture
+        png_result = processed_content["test_content.png"]
+        jpg_result = processed_content["test_content.jpg"]
         
         # Both should process successfully
-        assert png_chunks > 0
-        assert jpg_chunks > 0
+        assert png_result.chunks > 0
+        assert jpg_result.chunks > 0
         
         # Test same query on both
-        png_store = self.processor.load_vector_store(png_doc_id)
-        jpg_store = self.processor.load_vector_store(jpg_doc_id)
+        png_store = processor.load_vector_store(png_result.doc_id)
+        jpg_store = processor.load_vector_store(jpg_result.doc_id)
         
         test_query = "image content"
         png_results = png_store.similarity_search(test_query, k=3)
@@ -224,16 +171,11 @@ class TestContentImageProcessing:
         assert len(png_results) > 0, "PNG should be searchable"
         assert len(jpg_results) > 0, "JPG should be searchable"
     
-    def test_no_text_handling(self, setup):
+    def test_no_text_handling(self, processor, processed_png):
         """Test handling of images with no extractable text"""
-        png_file = self.test_files_dir / "test_content.png"
+        doc_id = processed_png.doc_id
         
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_content.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Should still create searchable content even with no text
         results = vector_store.similarity_search("no text", k=3)
@@ -245,17 +187,12 @@ class TestContentImageProcessing:
         has_visual_indicator = any(indicator in content for indicator in visual_indicators)
         assert has_visual_indicator, f"Should indicate visual content: {content}"
     
-    def test_future_vision_capabilities(self, setup):
+    def test_future_vision_capabilities(self, processor, processed_jpg):
         """Test framework for future vision model capabilities"""
         # This test establishes the framework for when we add vision models
-        jpg_file = self.test_files_dir / "test_content.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_content.jpg"
-        )
+        doc_id = processed_jpg.doc_id
         
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Framework for future vision queries about the English Bulldog
         future_vision_queries = [
@@ -281,8 +218,11 @@ class TestContentImageProcessing:
         ]
         
         # For now, just ensure the image is processed and searchable
-        for query, expected_future in future_vision_queries:
-            results = vector_store.similarity_search(query, k=3)
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in future_vision_queries], k=3
+        )
+        
+        for (query, expected_future), results in zip(future_vision_queries, batch_results):
             assert len(results) > 0, f"Image should be searchable for: {query}"
             
             # TODO: When vision models are implemented, uncomment this:
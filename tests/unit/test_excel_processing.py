@@ -4,56 +4,34 @@ Test suite for Excel (.xlsx) document processing in Greg
 Tests both analytical (invoice) and narrative (story) Excel files
 """
 
-import os
-import sys
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from src.document_processor import DocumentProcessor
-from src.config import Config
+from tests.utils import batch_similarity_search
 
 class TestExcelProcessing:
     """Test document processing for Excel files"""
     
-    @pytest.fixture
-    def setup(self):
-        """Setup test environment"""
-        # Create temp directories for testing
-        self.temp_upload = tempfile.mkdtemp()
-        self.temp_vectors = tempfile.mkdtemp()
-        
-        # Create config and override paths
-        self.config = Config()
-        self.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        # Create processor with modified config
-        self.processor = DocumentProcessor()
-        self.processor.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.processor.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        self.test_files_dir = Path(__file__).parent.parent / "fixtures"
-        
-        yield
-        
-        # Cleanup
-        shutil.rmtree(self.temp_upload, ignore_errors=True)
-        shutil.rmtree(self.temp_vectors, ignore_errors=True)
+    @pytest.fixture(scope="module")
+    def processed_invoice(self, precomputed_docs):
+        """Processing result for the invoice workbook"""
+        return precomputed_docs["test_invoice.xlsx"]
+    
+    @pytest.fixture(scope="module")
+    def invoice_doc(self, processor, processed_invoice):
+        """(doc_id, vector_store) for the processed invoice workbook"""
+        doc_id = processed_invoice.doc_id
+        return doc_id, processor.load_vector_store(doc_id)
+    
+    @pytest.fixture(scope="module")
+    def story_doc(self, processor, precomputed_docs):
+        """(doc_id, vector_store) for the story workbook"""
+        doc_id = precomputed_docs["test_story.xlsx"].doc_id
+        return doc_id, processor.load_vector_store(doc_id)
     
-    def test_xlsx_file_processing(self, setup):
+    def test_xlsx_file_processing(self, processor, processed_invoice):
         """Test basic processing of .xlsx files"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
         # Test that we can process an Excel file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
+        doc_id, pages, chunks, processing_time = processed_invoice
         
         # Assertions
         assert doc_id is not None
@@ -63,19 +41,11 @@ class TestExcelProcessing:
         assert processing_time > 0
         
         # Verify vector store was created
-        vector_store_path = self.processor.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
-        assert vector_store_path.exists()
+        assert processor.load_vector_store(doc_id) is not None
     
-    def test_xlsx_invoice_content(self, setup):
+    def test_xlsx_invoice_content(self, invoice_doc):
         """Test extraction of invoice data from Excel"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = invoice_doc
         
         # Test invoice-specific queries
         test_queries = [
@@ -86,22 +56,18 @@ class TestExcelProcessing:
             ("Dr Rachel Kim", "Rachel Kim"),
         ]
         
-        for query, expected_content in test_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in test_queries], k=5
+        )
+        
+        for (query, expected_content), results in zip(test_queries, batch_results):
             assert len(results) > 0
             found = any(expected_content in result.page_content for result in results)
             assert found, f"Expected '{expected_content}' not found in search results for query '{query}'"
     
-    def test_xlsx_multiple_sheets(self, setup):
+    def test_xlsx_multiple_sheets(self, invoice_doc):
         """Test that multiple sheets are processed"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
-        doc_id, pages, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = invoice_doc
         
         # Test content from different sheets
         sheet_queries = [
@@ -110,21 +76,17 @@ class TestExcelProcessing:
             ("Resource allocation Sarah Chen", "Lead Data Scientist"),  # Resources sheet
         ]
         
-        for query, expected in sheet_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in sheet_queries], k=5
+        )
+        
+        for (query, expected), results in zip(sheet_queries, batch_results):
             found = any(expected in result.page_content for result in results)
             assert found, f"Content from multiple sheets not found: {expected}"
     
-    def test_xlsx_story_comprehension(self, setup):
+    def test_xlsx_story_comprehension(self, story_doc):
         """Test narrative comprehension from story Excel"""
-        xlsx_file = self.test_files_dir / "test_story.xlsx"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_story.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = story_doc
         
         # Test story comprehension queries
         comprehension_queries = [
@@ -135,22 +97,18 @@ class TestExcelProcessing:
             ("Timeline November 22 events", "awakening requires willing minds"),
         ]
         
-        for query, expected in comprehension_queries:
-            results = vector_store.similarity_search(query, k=20)  # Increased k to find content across sheets
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in comprehension_queries], k=20  # Increased k to find content across sheets
+        )
+        
+        for (query, expected), results in zip(comprehension_queries, batch_results):
             assert len(results) > 0
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Story element '{expected}' not found for query '{query}'"
     
-    def test_xlsx_data_preservation(self, setup):
+    def test_xlsx_data_preservation(self, invoice_doc):
         """Test that Excel data structure is preserved"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = invoice_doc
         
         # Test that tabular relationships are maintained
         results = vector_store.similarity_search("Cloud Infrastructure Optimization cost", k=3)
@@ -161,16 +119,9 @@ class TestExcelProcessing:
         found_cost = any("32000" in r.page_content or "32,000" in r.page_content for r in results)
         assert found_item or found_cost, "Tabular data relationships not preserved"
     
-    def test_xlsx_metadata_preservation(self, setup):
+    def test_xlsx_metadata_preservation(self, invoice_doc):
         """Test that Excel metadata is preserved"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
-        doc_id, _, chunks, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = invoice_doc
         
         # Get a sample result
         results = vector_store.similarity_search("invoice", k=1)
@@ -183,16 +134,9 @@ class TestExcelProcessing:
         assert 'filename' in metadata
         assert metadata['filename'] == 'test_invoice.xlsx'
     
-    def test_xlsx_complex_queries(self, setup):
+    def test_xlsx_complex_queries(self, invoice_doc):
         """Test complex analytical queries on Excel data"""
-        xlsx_file = self.test_files_dir / "test_invoice.xlsx"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_invoice.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = invoice_doc
         
         # Complex queries that require understanding relationships
         complex_queries = [
@@ -202,21 +146,17 @@ class TestExcelProcessing:
             ("Total project phases", "Phase 4"),
         ]
         
-        for query, expected in complex_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in complex_queries], k=5
+        )
+        
+        for (query, expected), results in zip(complex_queries, batch_results):
             found = any(expected in result.page_content for result in results)
             assert found, f"Complex query failed: expected '{expected}' for '{query}'"
     
-    def test_xlsx_narrative_inference(self, setup):
+    def test_xlsx_narrative_inference(self, story_doc):
         """Test inference and comprehension from story Excel"""
-        xlsx_file = self.test_files_dir / "test_story.xlsx"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(xlsx_file), 
-            "test_story.xlsx"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
+        doc_id, vector_store = story_doc
         
         # Queries requiring inference and comprehension
         inference_queries = [
@@ -226,8 +166,11 @@ class TestExcelProcessing:
             ("Final status of the expedition members", "six human-shaped formations"),
         ]
         
-        for query, expected in inference_queries:
-            results = vector_store.similarity_search(query, k=20)  # Increased k to find content across sheets
+        batch_results = batch_similarity_search(
+            vector_store, [query for query, _ in inference_queries], k=20  # Increased k to find content across sheets
+        )
+        
+        for (query, expected), results in zip(inference_queries, batch_results):
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Inference query failed: expected '{expected}' for '{query}'"
 
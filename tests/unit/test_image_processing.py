@@ -4,56 +4,30 @@ Test suite for image processing (.png, .jpg) in Greg
 Tests OCR text extraction and image content analysis
 """
 
-import os
-import sys
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from src.document_processor import DocumentProcessor
-from src.config import Config
+from tests.utils import batch_similarity_search
 
 class TestImageProcessing:
     """Test document processing for image files"""
     
+    @pytest.fixture(scope="module")
+    def processed_invoices(self, processor, fixtures_dir):
+        """ProcessResult for each invoice image, OCR'd and embedded once per module"""
+        return {
+            name: processor.process_file(str(fixtures_dir / name), name)
+            for name in ("test_invoice.png", "test_invoice.jpg")
+        }
+    
     @pytest.fixture
-    def setup(self):
-        """Setup test environment"""
-        # Create temp directories for testing
-        self.temp_upload = tempfile.mkdtemp()
-        self.temp_vectors = tempfile.mkdtemp()
-        
-        # Create config and override paths
-        self.config = Config()
-        self.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        # Create processor with modified config
-        self.processor = DocumentProcessor()
-        self.processor.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.processor.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        self.test_files_dir = Path(__file__).parent.parent / "fixtures"
-        
-        yield
-        
-        # Cleanup
-        shutil.rmtree(self.temp_upload, ignore_errors=True)
-        shutil.rmtree(self.temp_vectors, ignore_errors=True)
+    def invoice_store(self, request, processor, processed_invoices):
+        """Vector store for the invoice image named by the test's parameter"""
+        return processor.load_vector_store(processed_invoices[request.param].doc_id)
     
-    def test_png_invoice_processing(self, setup):
+    def test_png_invoice_processing(self, processor, processed_invoices):
         """Test processing of PNG invoice image"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        
         # Test that we can process a PNG file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(png_file), 
-            "test_invoice.png"
-        )
+        doc_id, pages, chunks, processing_time = processed_invoices["test_invoice.png"]
         
         # Assertions
         assert doc_id is not None
@@ -63,18 +37,12 @@ class TestImageProcessing:
         assert processing_time > 0
         
         # Verify vector store was created
-        vector_store_path = self.processor.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
-        assert vector_store_path.exists()
+        assert processor.load_vector_store(doc_id) is not None
     
-    def test_jpg_invoice_processing(self, setup):
+    def test_jpg_invoice_processing(self, processor, processed_invoices):
         """Test processing of JPG invoice image"""
-        jpg_file = self.test_files_dir / "test_invoice.jpg"
-        
         # Test that we can process a JPG file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(jpg_file), 
-            "test_invoice.jpg"
-        )
+        doc_id, pages, chunks, processing_time = processed_invoices["test_invoice.jpg"]
         
         # Assertions
         assert doc_id is not None
@@ -82,26 +50,15 @@ class TestImageProcessing:
         assert processing_time > 0
         
         # Verify vector store was created
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Test search functionality
         results = vector_store.similarity_search("Easy Repair Inc", k=3)
         assert len(results) > 0
     
-    def test_png_invoice_ocr_content(self, setup):
-        """Test OCR text extraction from PNG invoice"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_invoice.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
-        # Test OCR-specific queries for invoice content
-        # Note: OCR may have some errors, so we test for core recognizable content
-        ocr_queries = [
+    # Note: OCR may have some errors, so we test for core recognizable content
+    @pytest.mark.parametrize("invoice_store, ocr_queries", [
+        ("test_invoice.png", [
             ("Repair Inc company name", "Repair Inc"),  # OCR shows "East Repair Inc"
             ("Invoice number US-001", "us-001"),  # OCR may change case
             ("Total amount 154.06", "154.06"),
@@ -109,27 +66,8 @@ class TestImageProcessing:
             ("Harvest Lane address", "Harvest Lane"),
             ("brake cables item", "brake cables"),
             ("Sales Tax percentage", "6.25%"),
-        ]
-        
-        for query, expected_content in ocr_queries:
-            results = vector_store.similarity_search(query, k=5)
-            assert len(results) > 0
-            found = any(expected_content in result.page_content for result in results)
-            assert found, f"OCR content '{expected_content}' not found in PNG for query '{query}'"
-    
-    def test_jpg_invoice_ocr_content(self, setup):
-        """Test OCR text extraction from JPG invoice"""
-        jpg_file = self.test_files_dir / "test_invoice.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_invoice.jpg"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
-        # Test OCR-specific queries for invoice content
-        ocr_queries = [
+        ]),
+        ("test_invoice.jpg", [
             ("Repair Inc company", "Repair Inc"),
             ("Invoice US-001", "us-001"),
             ("Total 154.06", "154.06"),
@@ -137,25 +75,22 @@ class TestImageProcessing:
             ("New York address", "New York"),
             ("pedal arms", "pedal arms"),
             ("Labor hours", "Labor"),
-        ]
+        ]),
+    ], indirect=["invoice_store"], ids=["png", "jpg"])
+    def test_invoice_ocr_content(self, invoice_store, ocr_queries):
+        """Test OCR text extraction from PNG and JPG invoices"""
+        batch_results = batch_similarity_search(
+            invoice_store, [query for query, _ in ocr_queries], k=5
+        )
         
-        for query, expected_content in ocr_queries:
-            results = vector_store.similarity_search(query, k=5)
+        for (query, expected_content), results in zip(ocr_queries, batch_results):
             assert len(results) > 0
             found = any(expected_content in result.page_content for result in results)
-            assert found, f"OCR content '{expected_content}' not found in JPG for query '{query}'"
+            assert found, f"OCR content '{expected_content}' not found for query '{query}'"
     
-    def test_invoice_detailed_extraction(self, setup):
+    @pytest.mark.parametrize("invoice_store", ["test_invoice.png"], indirect=True)
+    def test_invoice_detailed_extraction(self, invoice_store):
         """Test detailed data extraction from invoice image"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_invoice.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test specific invoice data extraction (based on OCR output)
         detailed_queries = [
             ("Invoice date 2019", "2019"),  # OCR shows "1110272019" 
@@ -167,22 +102,17 @@ class TestImageProcessing:
             ("Make checks payable Repair", "Repair"),  # OCR shows "East Repair Inc"
         ]
         
-        for query, expected in detailed_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            invoice_store, [query for query, _ in detailed_queries], k=5
+        )
+        
+        for (query, expected), results in zip(detailed_queries, batch_results):
             found = any(expected in result.page_content for result in results)
             assert found, f"Detailed content '{expected}' not found for query '{query}'"
     
-    def test_invoice_calculations(self, setup):
+    @pytest.mark.parametrize("invoice_store", ["test_invoice.jpg"], indirect=True)
+    def test_invoice_calculations(self, invoice_store):
         """Test extraction of calculated values from invoice"""
-        jpg_file = self.test_files_dir / "test_invoice.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_invoice.jpg"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test mathematical calculations and totals
         calculation_queries = [
             ("Quantity 2 pedal arms cost", "30.00"),  # 2 × 15.00
@@ -191,24 +121,19 @@ class TestImageProcessing:
             ("Final total amount", "154.06"),  # 145.00 + 9.06
         ]
         
-        for query, expected in calculation_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            invoice_store, [query for query, _ in calculation_queries], k=5
+        )
+        
+        for (query, expected), results in zip(calculation_queries, batch_results):
             found = any(expected in result.page_content for result in results)
             assert found, f"Calculation '{expected}' not found for query '{query}'"
     
-    def test_image_metadata_preservation(self, setup):
+    @pytest.mark.parametrize("invoice_store", ["test_invoice.png"], indirect=True)
+    def test_image_metadata_preservation(self, invoice_store):
         """Test that image metadata is preserved"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        
-        doc_id, _, chunks, _ = self.processor.process_file(
-            str(png_file), 
-            "test_invoice.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Get a sample result
-        results = vector_store.similarity_search("invoice", k=1)
+        results = invoice_store.similarity_search("invoice", k=1)
         assert len(results) > 0
         
         # Check metadata
@@ -218,26 +143,18 @@ class TestImageProcessing:
         assert 'filename' in metadata
         assert metadata['filename'] == 'test_invoice.png'
     
-    def test_both_formats_consistency(self, setup):
+    def test_both_formats_consistency(self, processor, processed_invoices):
         """Test that PNG and JPG formats produce consistent results"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        jpg_file = self.test_files_dir / "test_invoice.jpg"
-        
-        # Process both formats
-        png_doc_id, _, png_chunks, _ = self.processor.process_file(
-            str(png_file), "test_invoice.png"
-        )
-        jpg_doc_id, _, jpg_chunks, _ = self.processor.process_file(
-            str(jpg_file), "test_invoice.jpg"
-        )
+        png_doc_id, _, png_chunks, _ = processed_invoices["test_invoice.png"]
+        jpg_doc_id, _, jpg_chunks, _ = processed_invoices["test_invoice.jpg"]
         
         # Both should extract meaningful content
         assert png_chunks > 0
         assert jpg_chunks > 0
         
         # Test same query on both
-        png_store = self.processor.load_vector_store(png_doc_id)
-        jpg_store = self.processor.load_vector_store(jpg_doc_id)
+        png_store = processor.load_vector_store(png_doc_id)
+        jpg_store = processor.load_vector_store(jpg_doc_id)
         
         test_query = "Repair Inc"  # OCR shows "East Repair Inc"
         png_results = png_store.similarity_search(test_query, k=3)
@@ -250,17 +167,9 @@ class TestImageProcessing:
         assert png_found, "PNG should extract 'Repair Inc'"
         assert jpg_found, "JPG should extract 'Repair Inc'"
     
-    def test_complex_invoice_queries(self, setup):
+    @pytest.mark.parametrize("invoice_store", ["test_invoice.png"], indirect=True)
+    def test_complex_invoice_queries(self, invoice_store):
         """Test complex analytical queries on invoice image"""
-        png_file = self.test_files_dir / "test_invoice.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_invoice.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Complex queries requiring understanding relationships (based on OCR output)
         complex_queries = [
             ("Who is the invoice billed to", "John Smith"),
@@ -271,10 +180,13 @@ class TestImageProcessing:
             ("Where should checks be made payable", "Repair"),  # OCR may vary
         ]
         
-        for query, expected in complex_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            invoice_store, [query for query, _ in complex_queries], k=5
+        )
+        
+        for (query, expected), results in zip(complex_queries, batch_results):
             found = any(expected in result.page_content for result in results)
             assert found, f"Complex query failed: expected '{expected}' for '{query}'"
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
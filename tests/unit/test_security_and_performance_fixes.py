@@ -1,12 +1,10 @@
 #!/usr/bin/env python3
 """Comprehensive test for all security and performance fixes"""
 
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import json
+import orjson
 import time
+import tempfile
 import threading
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -18,10 +16,9 @@ from src.security import (
     validate_vector_store_path, is_safe_url
 )
 from src.vector_store_manager import VectorStoreManager
-from src.performance.request_queue import RequestQueueManager
-from src.ui.session_manager import IsolatedSessionManager
+from src.performance.request_queue import RequestQueueManager, Request, RequestStatus
 
-def test_security_functions():
+def test_security_functions(tmp_path):
     """Test all security functions"""
     print("Testing security functions...")
     
@@ -35,8 +32,8 @@ def test_security_functions():
     print("✅ Filename sanitization working")
     
     # Test safe file path creation
-    test_dir = Path("/tmp/test_upload")
-    test_dir.mkdir(exist_ok=True)
+    test_dir = tmp_path / "test_upload"
+    test_dir.mkdir()
     
     try:
         safe_path = create_safe_file_path("test.pdf", test_dir)
@@ -93,44 +90,42 @@ def test_security_functions():
     assert is_safe_url("javascript:alert('xss')") == False
     print("✅ URL validation working")
     
-    # Clean up
-    test_dir.rmdir()
-    
     print("✅ All security functions passed!\n")
 
-def test_vector_store_manager():
+def test_vector_store_manager(tmp_path):
     """Test vector store manager functionality"""
     print("Testing vector store manager...")
     
     # Create test directories
-    vector_dir = Path("/tmp/test_vectors")
-    upload_dir = Path("/tmp/test_uploads")
-    vector_dir.mkdir(exist_ok=True)
-    upload_dir.mkdir(exist_ok=True)
+    vector_dir = tmp_path / "test_vectors"
+    upload_dir = tmp_path / "test_uploads"
+    vector_dir.mkdir()
+    upload_dir.mkdir()
     
     # Initialize manager
     manager = VectorStoreManager(vector_dir, upload_dir)
     
-    # Create some test vector stores
-    for i in range(5):
-        store_dir = vector_dir / f"doc{i}.faiss"
-        store_dir.mkdir(exist_ok=True)
-        
-        # Create metadata file
-        metadata = {
+    # Create some test vector stores (the manager skips metadata without a .faiss dir)
+    now = datetime.now()
+    payloads = [
+        orjson.dumps({
             'document_id': f'doc{i}',
             'filename': f'test{i}.pdf',
-            'upload_date': (datetime.now() - timedelta(days=i)).isoformat(),
+            'upload_date': (now - timedelta(days=i)).isoformat(),
             'file_size_mb': 1.0
-        }
-        
-        with open(vector_dir / f"doc{i}.metadata", 'w') as f:
-            json.dump(metadata, f)
-        
-        # Make some files old
-        if i > 2:
-            old_time = time.time() - (8 * 24 * 3600)  # 8 days old
-            os.utime(vector_dir / f"doc{i}.metadata", (old_time, old_time))
+        })
+        for i in range(5)
+    ]
+    metadata_paths = [vector_dir / f"doc{i}.metadata" for i in range(5)]
+    
+    for i, (metadata_path, payload) in enumerate(zip(metadata_paths, payloads)):
+        (vector_dir / f"doc{i}.faiss").mkdir()
+        metadata_path.write_bytes(payload)
+    
+    # Make some files old
+    old_time = time.time() - (8 * 24 * 3600)  # 8 days old
+    for metadata_path in metadata_paths[3:]:
+        os.utime(metadata_path, (old_time, old_time))
     
     # Test cleanup
     stats = manager.cleanup_old_stores(force=True)
@@ -149,11 +144,6 @@ def test_vector_store_manager():
         print(f"Stats: {storage_stats}")
         raise
     
-    # Clean up
-    import shutil
-    shutil.rmtree(vector_dir)
-    shutil.rmtree(upload_dir)
-    
     print("✅ Vector store manager tests passed!\n")
 
 def test_request_queue_race_conditions():
@@ -180,9 +170,8 @@ def test_request_queue_race_conditions():
             req_id = queue.submit_request("test", {"value": i})
             request_ids.append(req_id)
             
-            # Try to get result
-            time.sleep(0.2)  # Wait for processing
-            status = queue.get_request_status(req_id)
+            # Block until the request finishes rather than sleeping
+            status = queue.wait_for_request(req_id, timeout=2.0)
             if status:
                 results[i] = status
         except Exception as e:
@@ -216,82 +205,28 @@ def test_request_queue_race_conditions():
     
     print("✅ Request queue race condition tests passed!\n")
 
-def test_session_isolation():
-    """Test session isolation functionality"""
-    print("Testing session isolation...")
+def test_request_queue_eviction_with_cancelled_requests():
+    """Evicting old completed requests must cope with cancelled ones (no completed_at)"""
+    queue = RequestQueueManager(max_concurrent=1)
+    queue.register_handler("test", lambda value: value)
+    
+    # A full completed history made of cancelled requests
+    with queue._completed_lock:
+        for i in range(100):
+            queue._completed[f"cancelled-{i}"] = Request(
+                id=f"cancelled-{i}", type="test", data={}, status=RequestStatus.CANCELLED,
+                created_at=time.time()
+            )
+    
+    req_id = queue.submit_request("test", {"value": 1})
+    start = time.time()
+    status = queue.wait_for_request(req_id, timeout=2.0)
+    
+    assert time.time() - start < 1.0, "wait_for_request waited for the timeout"
+    assert status.status == RequestStatus.COMPLETED
+    assert len(queue._completed) == 100
     
-    # Initialize manager
-    manager = IsolatedSessionManager()
-    
-    # Create test sessions
-    session1_id = "test_session_1"
-    session2_id = "test_session_2"
-    
-    # Save data for session 1
-    session1_file = manager.session_dir / f"session_{session1_id}.json"
-    session1_data = {
-        'session_id': session1_id,
-        'timestamp': time.time(),
-        'data': {
-            'current_document_id': 'doc_session1',
-            'messages': [{'role': 'user', 'content': 'Session 1 message'}]
-        }
-    }
-    with open(session1_file, 'w') as f:
-        json.dump(session1_data, f)
-    
-    # Save data for session 2
-    session2_file = manager.session_dir / f"session_{session2_id}.json"
-    session2_data = {
-        'session_id': session2_id,
-        'timestamp': time.time(),
-        'data': {
-            'current_document_id': 'doc_session2',
-            'messages': [{'role': 'user', 'content': 'Session 2 message'}]
-        }
-    }
-    with open(session2_file, 'w') as f:
-        json.dump(session2_data, f)
-    
-    # Verify isolation
-    with open(session1_file, 'r') as f:
-        loaded1 = json.load(f)
-    with open(session2_file, 'r') as f:
-        loaded2 = json.load(f)
-    
-    assert loaded1['data']['current_document_id'] != loaded2['data']['current_document_id']
-    assert loaded1['data']['messages'][0]['content'] != loaded2['data']['messages'][0]['content']
-    print("✅ Sessions are properly isolated")
-    
-    # Test cleanup
-    old_session_id = "old_session"
-    old_file = manager.session_dir / f"session_{old_session_id}.json"
-    old_data = {
-        'session_id': old_session_id,
-        'timestamp': time.time() - 7200,
-        'data': {}
-    }
-    with open(old_file, 'w') as f:
-        json.dump(old_data, f)
-    
-    # Make file old
-    old_time = time.time() - 7200
-    os.utime(old_file, (old_time, old_time))
-    
-    # Run cleanup
-    manager._last_cleanup = 0
-    manager._cleanup_old_sessions()
-    
-    assert not old_file.exists()
-    print("✅ Old session cleanup working")
-    
-    # Clean up test files
-    if session1_file.exists():
-        session1_file.unlink()
-    if session2_file.exists():
-        session2_file.unlink()
-    
-    print("✅ Session isolation tests passed!\n")
+    queue.shutdown()
 
 def test_all_integrations():
     """Test that all components work together"""
@@ -321,10 +256,12 @@ def main():
     print()
     
     try:
-        test_security_functions()
-        test_vector_store_manager()
+        with tempfile.TemporaryDirectory() as tmp:
+            test_security_functions(Path(tmp))
+        with tempfile.TemporaryDirectory() as tmp:
+            test_vector_store_manager(Path(tmp))
         test_request_queue_race_conditions()
-        test_session_isolation()
+        test_request_queue_eviction_with_cancelled_requests()
         test_all_integrations()
         
         print("=" * 60)
@@ -333,12 +270,12 @@ def main():
         
     except AssertionError as e:
         print(f"\n❌ Test failed: {e}")
-        sys.exit(1)
+        raise SystemExit(1)
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
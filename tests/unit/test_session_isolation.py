@@ -1,56 +1,34 @@
 #!/usr/bin/env python3
 """Test session isolation functionality"""
 
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import json
+import orjson
 import time
-import hashlib
 import uuid
-from pathlib import Path
-from src.ui.session_manager import IsolatedSessionManager, session_manager
+import pytest
+from src.ui.session_manager import session_manager
 try:
     import streamlit as st
 except ImportError:
     # Create a mock Streamlit module for testing
     class MockStreamlit:
-        class session_state:
-            data = {}
-            
-            @classmethod
-            def __getitem__(cls, key):
-                return cls.data[key]
-            
-            @classmethod
-            def __setitem__(cls, key, value):
-                cls.data[key] = value
-            
-            @classmethod
-            def __contains__(cls, key):
-                return key in cls.data
-            
-            @classmethod
-            def get(cls, key, default=None):
-                return cls.data.get(key, default)
-            
-            @classmethod
-            def clear(cls):
-                cls.data.clear()
+        # Item access, get() and clear() are all the tests need; a dict provides them
+        session_state = {}
     
     st = MockStreamlit()
 
-def test_session_isolation():
+@pytest.fixture(scope="module")
+def manager():
+    """The app's shared IsolatedSessionManager, used by every test in this module"""
+    return session_manager
+
+def test_session_isolation(manager):
     """Test that different sessions are isolated"""
     print("Testing session isolation...")
     
-    # Initialize manager
-    manager = IsolatedSessionManager()
-    
     # Simulate two different sessions
-    session1_id = hashlib.sha256(f"{time.time()}-session1".encode()).hexdigest()[:16]
-    session2_id = hashlib.sha256(f"{time.time()}-session2".encode()).hexdigest()[:16]
+    session1_id = uuid.uuid4().hex[:16]
+    session2_id = uuid.uuid4().hex[:16]
     
     print(f"Session 1 ID: {session1_id}")
     print(f"Session 2 ID: {session2_id}")
@@ -66,8 +44,7 @@ def test_session_isolation():
             'selected_model': 'mistral'
         }
     }
-    with open(session1_file, 'w') as f:
-        json.dump(session1_data, f)
+    session1_file.write_bytes(orjson.dumps(session1_data))
     
     # Save data for session 2
     session2_file = manager.session_dir / f"session_{session2_id}.json"
@@ -80,13 +57,11 @@ def test_session_isolation():
             'selected_model': 'llama2'
         }
     }
-    with open(session2_file, 'w') as f:
-        json.dump(session2_data, f)
+    session2_file.write_bytes(orjson.dumps(session2_data))
     
     # Test loading session 1
     print("\nLoading session 1 data...")
-    with open(session1_file, 'r') as f:
-        loaded_session1 = json.load(f)
+    loaded_session1 = orjson.loads(session1_file.read_bytes())
     
     assert loaded_session1['data']['current_document_id'] == 'doc123'
     assert loaded_session1['data']['messages'][0]['content'] == 'Hello from session 1'
@@ -95,8 +70,7 @@ def test_session_isolation():
     
     # Test loading session 2
     print("\nLoading session 2 data...")
-    with open(session2_file, 'r') as f:
-        loaded_session2 = json.load(f)
+    loaded_session2 = orjson.loads(session2_file.read_bytes())
     
     assert loaded_session2['data']['current_document_id'] == 'doc456'
     assert loaded_session2['data']['messages'][0]['content'] == 'Hello from session 2'
@@ -107,18 +81,18 @@ def test_session_isolation():
     print("\nTesting cleanup of expired sessions...")
     
     # Create an old session file
-    old_session_id = hashlib.sha256(f"{time.time()}-old".encode()).hexdigest()[:16]
+    old_time = time.time() - 7200  # 2 hours old
+    old_session_id = uuid.uuid4().hex[:16]
     old_session_file = manager.session_dir / f"session_{old_session_id}.json"
     old_session_data = {
         'session_id': old_session_id,
-        'timestamp': time.time() - 7200,  # 2 hours old
+        'timestamp': old_time,
         'data': {'current_document_id': 'old_doc'}
     }
-    with open(old_session_file, 'w') as f:
-        json.dump(old_session_data, f)
+    old_session_file.write_bytes(orjson.dumps(old_session_data))
     
     # Modify file time to be old
-    os.utime(old_session_file, (time.time() - 7200, time.time() - 7200))
+    os.utime(old_session_file, (old_time, old_time))
     
     # Force cleanup
     manager._last_cleanup = 0
@@ -141,9 +115,7 @@ def test_session_isolation():
     
     print("\n✅ All session isolation tests passed!")
 
-import pytest
-
-def test_session_persistence():
+def test_session_persistence(manager):
     """Test session state persistence and restoration"""
     print("\nTesting session persistence...")
     
@@ -167,7 +139,7 @@ def test_session_persistence():
         st.session_state['temperature'] = 0.5
         
         # Save state
-        session_manager.save_state()
+        manager.save_state()
         
         # Clear session state
         if hasattr(st.session_state, 'clear'):
@@ -177,7 +149,7 @@ def test_session_persistence():
         st.session_state['session_id'] = 'test_session_123'
         
         # Load state
-        loaded = session_manager.load_state()
+        loaded = manager.load_state()
         
         assert loaded == True
         assert st.session_state['current_document_id'] == 'test_doc'
@@ -188,7 +160,7 @@ def test_session_persistence():
         print("✅ Session persistence working correctly")
         
         # Clean up
-        session_file = session_manager.get_session_file('test_session_123')
+        session_file = manager.get_session_file('test_session_123')
         if session_file.exists():
             session_file.unlink()
         
@@ -200,6 +172,6 @@ def test_session_persistence():
             st.session_state.data.clear()
 
 if __name__ == "__main__":
-    test_session_isolation()
-    test_session_persistence()
+    test_session_isolation(session_manager)
+    test_session_persistence(session_manager)
     print("\n✅ All tests passed!")
\ No newline at end of file
@@ -4,56 +4,30 @@ Test suite for story image processing (.png, .jpg) in Greg
 Tests OCR narrative text extraction and story comprehension
 """
 
-import os
-import sys
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from src.document_processor import DocumentProcessor
-from src.config import Config
+from tests.utils import batch_similarity_search
 
 class TestStoryImageProcessing:
     """Test document processing for story image files"""
     
+    @pytest.fixture(scope="module")
+    def processed_stories(self, processor, fixtures_dir):
+        """ProcessResult for each story image, OCR'd and embedded once per module"""
+        return {
+            name: processor.process_file(str(fixtures_dir / name), name)
+            for name in ("test_story.png", "test_story.jpg")
+        }
+    
     @pytest.fixture
-    def setup(self):
-        """Setup test environment"""
-        # Create temp directories for testing
-        self.temp_upload = tempfile.mkdtemp()
-        self.temp_vectors = tempfile.mkdtemp()
-        
-        # Create config and override paths
-        self.config = Config()
-        self.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        # Create processor with modified config
-        self.processor = DocumentProcessor()
-        self.processor.config.UPLOAD_DIR = Path(self.temp_upload)
-        self.processor.config.VECTOR_STORE_DIR = Path(self.temp_vectors)
-        
-        self.test_files_dir = Path(__file__).parent.parent / "fixtures"
-        
-        yield
-        
-        # Cleanup
-        shutil.rmtree(self.temp_upload, ignore_errors=True)
-        shutil.rmtree(self.temp_vectors, ignore_errors=True)
+    def story_store(self, request, processor, processed_stories):
+        """Vector store for the story image named by the test's parameter"""
+        return processor.load_vector_store(processed_stories[request.param].doc_id)
     
-    def test_png_story_processing(self, setup):
+    def test_png_story_processing(self, processor, processed_stories):
         """Test processing of PNG story image"""
-        png_file = self.test_files_dir / "test_story.png"
-        
         # Test that we can process a PNG story file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(png_file), 
-            "test_story.png"
-        )
+        doc_id, pages, chunks, processing_time = processed_stories["test_story.png"]
         
         # Assertions
         assert doc_id is not None
@@ -63,18 +37,12 @@ class TestStoryImageProcessing:
         assert processing_time > 0
         
         # Verify vector store was created
-        vector_store_path = self.processor.config.VECTOR_STORE_DIR / f"{doc_id}.faiss"
-        assert vector_store_path.exists()
+        assert processor.load_vector_store(doc_id) is not None
     
-    def test_jpg_story_processing(self, setup):
+    def test_jpg_story_processing(self, processor, processed_stories):
         """Test processing of JPG story image"""
-        jpg_file = self.test_files_dir / "test_story.jpg"
-        
         # Test that we can process a JPG story file
-        doc_id, pages, chunks, processing_time = self.processor.process_file(
-            str(jpg_file), 
-            "test_story.jpg"
-        )
+        doc_id, pages, chunks, processing_time = processed_stories["test_story.jpg"]
         
         # Assertions
         assert doc_id is not None
@@ -82,23 +50,15 @@ class TestStoryImageProcessing:
         assert processing_time > 0
         
         # Verify vector store was created
-        vector_store = self.processor.load_vector_store(doc_id)
+        vector_store = processor.load_vector_store(doc_id)
         
         # Test search functionality for story content
         results = vector_store.similarity_search("WHAT REMAINS", k=3)
         assert len(results) > 0
     
-    def test_png_story_narrative_content(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.png"], indirect=True)
+    def test_png_story_narrative_content(self, story_store):
         """Test narrative content extraction from PNG story"""
-        png_file = self.test_files_dir / "test_story.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_story.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test story-specific narrative elements
         narrative_queries = [
             ("Story title What Remains", "WHAT REMAINS"),
@@ -110,23 +70,18 @@ class TestStoryImageProcessing:
             ("Digging graves with spade", "spade"),
         ]
         
-        for query, expected_content in narrative_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in narrative_queries], k=5
+        )
+        
+        for (query, expected_content), results in zip(narrative_queries, batch_results):
             assert len(results) > 0
             found = any(expected_content.lower() in result.page_content.lower() for result in results)
             assert found, f"Narrative content '{expected_content}' not found in PNG for query '{query}'"
     
-    def test_jpg_story_narrative_content(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.jpg"], indirect=True)
+    def test_jpg_story_narrative_content(self, story_store):
         """Test narrative content extraction from JPG story"""
-        jpg_file = self.test_files_dir / "test_story.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_story.jpg"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test story-specific narrative elements
         narrative_queries = [
             ("Story title", "WHAT REMAINS"),
@@ -138,23 +93,18 @@ class TestStoryImageProcessing:
             ("Burial with stones", "stones"),
         ]
         
-        for query, expected_content in narrative_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in narrative_queries], k=5
+        )
+        
+        for (query, expected_content), results in zip(narrative_queries, batch_results):
             assert len(results) > 0
             found = any(expected_content.lower() in result.page_content.lower() for result in results)
             assert found, f"Narrative content '{expected_content}' not found in JPG for query '{query}'"
     
-    def test_story_character_actions(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.png"], indirect=True)
+    def test_story_character_actions(self, story_store):
         """Test extraction of character actions from story"""
-        png_file = self.test_files_dir / "test_story.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_story.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test specific character actions and story events
         action_queries = [
             ("Woman stooped low to gather", "stooped"),
@@ -166,22 +116,17 @@ class TestStoryImageProcessing:
             ("Brushing hands on pants", "brushed"),
         ]
         
-        for query, expected in action_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in action_queries], k=5
+        )
+        
+        for (query, expected), results in zip(action_queries, batch_results):
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Character action '{expected}' not found for query '{query}'"
     
-    def test_story_setting_details(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.jpg"], indirect=True)
+    def test_story_setting_details(self, story_store):
         """Test extraction of setting and environmental details"""
-        jpg_file = self.test_files_dir / "test_story.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_story.jpg"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test setting and environmental details
         setting_queries = [
             ("Neighborhood where she walked", "neighborhood"),
@@ -192,22 +137,17 @@ class TestStoryImageProcessing:
             ("Small rocks marking graves", "rock"),
         ]
         
-        for query, expected in setting_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in setting_queries], k=5
+        )
+        
+        for (query, expected), results in zip(setting_queries, batch_results):
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Setting detail '{expected}' not found for query '{query}'"
     
-    def test_story_emotional_content(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.png"], indirect=True)
+    def test_story_emotional_content(self, story_store):
         """Test extraction of emotional and descriptive content"""
-        png_file = self.test_files_dir / "test_story.png"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(png_file), 
-            "test_story.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test emotional and descriptive elements
         emotional_queries = [
             ("Careful handling of animals", "careful"),
@@ -218,22 +158,17 @@ class TestStoryImageProcessing:
             ("Cracked her back from work", "cracked"),
         ]
         
-        for query, expected in emotional_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in emotional_queries], k=5
+        )
+        
+        for (query, expected), results in zip(emotional_queries, batch_results):
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Emotional content '{expected}' not found for query '{query}'"
     
-    def test_story_comprehension_questions(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.jpg"], indirect=True)
+    def test_story_comprehension_questions(self, story_store):
         """Test comprehension of story themes and meaning"""
-        jpg_file = self.test_files_dir / "test_story.jpg"
-        
-        doc_id, _, _, _ = self.processor.process_file(
-            str(jpg_file), 
-            "test_story.jpg"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Test comprehension-level questions about the story
         comprehension_queries = [
             ("What does the woman collect", "dead"),  # Dead animals
@@ -244,31 +179,26 @@ class TestStoryImageProcessing:
             ("What kind of gate does she have", "rusted"),  # Rusted gate
         ]
         
-        for query, expected in comprehension_queries:
-            results = vector_store.similarity_search(query, k=5)
+        batch_results = batch_similarity_search(
+            story_store, [query for query, _ in comprehension_queries], k=5
+        )
+        
+        for (query, expected), results in zip(comprehension_queries, batch_results):
             found = any(expected.lower() in result.page_content.lower() for result in results)
             assert found, f"Comprehension element '{expected}' not found for query '{query}'"
     
-    def test_story_format_consistency(self, setup):
+    def test_story_format_consistency(self, processor, processed_stories):
         """Test that PNG and JPG story formats produce consistent results"""
-        png_file = self.test_files_dir / "test_story.png"
-        jpg_file = self.test_files_dir / "test_story.jpg"
-        
-        # Process both formats
-        png_doc_id, _, png_chunks, _ = self.processor.process_file(
-            str(png_file), "test_story.png"
-        )
-        jpg_doc_id, _, jpg_chunks, _ = self.processor.process_file(
-            str(jpg_file), "test_story.jpg"
-        )
+        png_doc_id, _, png_chunks, _ = processed_stories["test_story.png"]
+        jpg_doc_id, _, jpg_chunks, _ = processed_stories["test_story.jpg"]
         
         # Both should extract meaningful content
         assert png_chunks > 0
         assert jpg_chunks > 0
         
         # Test same narrative query on both
-        png_store = self.processor.load_vector_store(png_doc_id)
-        jpg_store = self.processor.load_vector_store(jpg_doc_id)
+        png_store = processor.load_vector_store(png_doc_id)
+        jpg_store = processor.load_vector_store(jpg_doc_id)
         
         test_query = "woman gathered raccoon"
         png_results = png_store.similarity_search(test_query, k=3)
@@ -281,19 +211,11 @@ class TestStoryImageProcessing:
         assert png_found, "PNG should extract story content about raccoon"
         assert jpg_found, "JPG should extract story content about raccoon"
     
-    def test_story_metadata_preservation(self, setup):
+    @pytest.mark.parametrize("story_store", ["test_story.png"], indirect=True)
+    def test_story_metadata_preservation(self, story_store):
         """Test that story image metadata is preserved"""
-        png_file = self.test_files_dir / "test_story.png"
-        
-        doc_id, _, chunks, _ = self.processor.process_file(
-            str(png_file), 
-            "test_story.png"
-        )
-        
-        vector_store = self.processor.load_vector_store(doc_id)
-        
         # Get a sample result
-        results = vector_store.similarity_search("story", k=1)
+        results = story_store.similarity_search("story", k=1)
         assert len(results) > 0
         
         # Check metadata
@@ -2,17 +2,15 @@
 import pytest
 import json
 import time
+import threading
 from unittest.mock import Mock, patch
-import sys
-from pathlib import Path
-
-# Add project root to path
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
 
 from src.streaming.handler import StreamingResponseHandler, create_streaming_response
 from src.qa_chain_unified import UnifiedQAChain
 
+# The handlers never inspect the LLMResult, so one placeholder serves every test
+LLM_RESULT = Mock()
+
 
 def test_streaming_handler():
     """Test basic streaming handler functionality"""
@@ -22,7 +20,7 @@ def test_streaming_handler():
     handler.on_llm_new_token("Hello")
     handler.on_llm_new_token(" ")
     handler.on_llm_new_token("world")
-    handler.on_llm_end(Mock(), test=True)
+    handler.on_llm_end(LLM_RESULT, test=True)
     
     # Check queue
     assert handler.queue.get() == "Hello"
@@ -39,16 +37,35 @@ def test_streaming_response_generator():
     # Add tokens
     handler.on_llm_new_token("Test")
     handler.on_llm_new_token(" token")
-    handler.on_llm_end(Mock())
+    handler.on_llm_end(LLM_RESULT)
     
     # Generate response
     responses = list(create_streaming_response(handler))
     
-    # Check format
-    assert len(responses) == 3  # 2 tokens + done
-    assert 'data: {"token": "Test"}' in responses[0]
-    assert 'data: {"token": " token"}' in responses[1]
-    assert 'data: {"done": true}' in responses[2]
+    # Check format: tokens already queued are sent together in one event
+    assert len(responses) == 2  # batched tokens + done
+    assert 'data: {"token": "Test token"}' in responses[0]
+    assert 'data: {"done": true}' in responses[1]
+
+
+def test_streaming_response_generator_interleaved():
+    """Test that tokens arriving while the client reads are all delivered in order"""
+    handler = StreamingResponseHandler()
+    
+    def produce():
+        for token in ["Hello", " ", "world"]:
+            handler.on_llm_new_token(token)
+            time.sleep(0.01)
+        handler.on_llm_end(LLM_RESULT)
+    
+    producer = threading.Thread(target=produce)
+    producer.start()
+    responses = list(create_streaming_response(handler))
+    producer.join()
+    
+    events = [json.loads(response[len("data: "):]) for response in responses]
+    assert events[-1] == {'done': True}
+    assert "".join(event['token'] for event in events[:-1]) == "Hello world"
 
 
 def test_streaming_request_model():
@@ -76,9 +93,6 @@ def test_unified_qa_chain_init():
 
 def test_api_streaming_endpoint():
     """Test that API endpoints support streaming parameter"""
-    from main import app
-    from fastapi.testclient import TestClient
-    
     # Just verify the endpoint accepts the streaming parameter
     # without actually calling it (which would require full setup)
     from main import QuestionRequest
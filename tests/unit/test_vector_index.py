@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test suite for the configurable FAISS index behind document vector stores
+"""
+
+import hashlib
+
+import faiss
+import numpy as np
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import _choice
+from src.document_processor import DocumentProcessor
+
+DIMENSION = 32
+
+TEXTS = [f"Invoice line {i}: item-{i} shipped to customer-{i}" for i in range(40)]
+
+
+class StubEmbeddings(Embeddings):
+    """Deterministic bag-of-words vectors, so tests need no embedding model"""
+
+    def _embed(self, text: str) -> list:
+        vector = np.zeros(DIMENSION, dtype='float32')
+        for word in text.split():
+            vector[int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % DIMENSION] += 1.0
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def index_processor(tmp_path):
+    """DocumentProcessor with stub embeddings, saving stores to a temp directory"""
+    with patch('src.document_processor.OptimizedLLM'), \
+            patch('src.document_processor.IncrementalProcessor'):
+        processor = DocumentProcessor()
+    processor.config.VECTOR_STORE_DIR = tmp_path
+    processor.config.VECTOR_STORE_IN_MEMORY = False
+    processor.embeddings = StubEmbeddings()
+    processor._get_embeddings_for_loading = StubEmbeddings
+    return processor
+
+
+@pytest.mark.parametrize("index_type, quantization, expected_index", [
+    ("flat", "none", faiss.IndexFlat),
+    ("hnsw", "none", faiss.IndexHNSWFlat),
+    ("flat", "fp16", faiss.IndexScalarQuantizer),
+    ("flat", "int8", faiss.IndexScalarQuantizer),
+    ("hnsw", "fp16", faiss.IndexHNSWSQ),
+    ("hnsw", "int8", faiss.IndexHNSWSQ),
+])
+def test_build_search_and_reload(index_processor, index_type, quantization, expected_index):
+    """Stores build with the configured index, find exact matches and survive save/load"""
+    config = index_processor.config
+    config.VECTOR_INDEX_TYPE = index_type
+    config.VECTOR_INDEX_QUANTIZATION = quantization
+
+    chunks = [Document(page_content=text, metadata={'chunk': i}) for i, text in enumerate(TEXTS)]
+    vector_store = index_processor._build_vector_store(
+        chunks, index_processor.embeddings.embed_documents(TEXTS)
+    )
+    assert isinstance(vector_store.index, expected_index)
+    if quantization == "int8":
+        assert vector_store.index.is_trained
+    assert vector_store.index.ntotal == len(TEXTS)
+    assert vector_store.similarity_search(TEXTS[7], k=1)[0].metadata['chunk'] == 7
+
+    vector_store.save_local(str(config.VECTOR_STORE_DIR / "doc.faiss"))
+
+    # The search breadth configured at load time wins over the one saved with the index
+    config.HNSW_EF_SEARCH = 64
+    loaded = index_processor.load_vector_store("doc")
+    if index_type == "hnsw":
+        assert loaded.index.hnsw.efSearch == 64
+
+    for i in (0, 19, 39):
+        assert loaded.similarity_search(TEXTS[i], k=1)[0].metadata['chunk'] == i
+
+
+@pytest.mark.parametrize("name, default, choices, valid, invalid", [
+    ("VECTOR_INDEX_TYPE", "flat", ("flat", "hnsw"), "HNSW", "hsnw"),
+    ("VECTOR_INDEX_QUANTIZATION", "none", ("none", "fp16", "int8"), "INT8", "int4"),
+])
+def test_unknown_index_settings_are_rejected(monkeypatch, name, default, choices, valid, invalid):
+    """Misspelled index settings fail loudly instead of falling back to the default"""
+    monkeypatch.setenv(name, valid)
+    assert _choice(name, default, choices) == valid.lower()
+
+    monkeypatch.setenv(name, invalid)
+    with pytest.raises(ValueError, match=name):
+        _choice(name, default, choices)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,9 +1,54 @@
 """Unit tests for web search functionality"""
 import pytest
 import time
-from datetime import datetime
+from unittest.mock import Mock, patch
 from src.web_search import WebSearcher, SearchResult
 
+# Trimmed-down DuckDuckGo HTML results page: one ad-style result without a title link is skipped
+SERP_HTML = """
+<html><body>
+<div class="result results_links web-result"><div class="result__body">
+  <a class="result__a" href="https://example.com/python">Python Programming Tutorial</a>
+  <a class="result__snippet" href="https://example.com/python">Learn Python programming from scratch</a>
+</div></div>
+<div class="result results_links web-result"><div class="result__body">
+  <span>Sponsored</span>
+</div></div>
+<div class="result results_links web-result"><div class="result__body">
+  <a class="result__a" href="//example.com/advanced-python">Advanced Python Techniques</a>
+  <a class="result__snippet" href="//example.com/advanced-python">Master advanced Python concepts</a>
+</div></div>
+</body></html>
+"""
+
+EXAMPLE_HTML = """
+<html><head><title>Example Domain</title><style>body { font-family: sans-serif; }</style></head>
+<body><div>
+  <h1>Example Domain</h1>
+  <p>This domain is for use in illustrative examples in documents.
+  You may use this domain in literature without prior coordination or asking for permission.</p>
+  <p><a href="https://www.iana.org/domains/example">More information...</a></p>
+</div><script>tracker();</script></body></html>
+"""
+
+
+def _html_response(html):
+    """Stand-in for a successful requests.Response carrying the given HTML"""
+    return Mock(text=html, status_code=200, raise_for_status=Mock())
+
+
+@pytest.fixture(scope="module")
+def shared_searcher():
+    """One WebSearcher (and requests.Session) for the whole module"""
+    return WebSearcher()
+
+
+@pytest.fixture
+def searcher(shared_searcher):
+    """The shared WebSearcher, starting each test with an empty cache"""
+    shared_searcher.clear_cache()
+    return shared_searcher
+
 
 class TestWebSearch:
     """Test web search functionality"""
@@ -30,10 +75,8 @@ class TestWebSearch:
         assert len(searcher.cache) == 0
         assert searcher.session is not None
         
-    def test_cache_key_generation(self):
+    def test_cache_key_generation(self, searcher):
         """Test cache key generation"""
-        searcher = WebSearcher()
-        
         key1 = searcher._get_cache_key("test query", 5)
         key2 = searcher._get_cache_key("test query", 5)
         key3 = searcher._get_cache_key("different query", 5)
@@ -41,10 +84,8 @@ class TestWebSearch:
         assert key1 == key2  # Same query should produce same key
         assert key1 != key3  # Different queries should produce different keys
         
-    def test_content_sanitization(self):
+    def test_content_sanitization(self, searcher):
         """Test content sanitization"""
-        searcher = WebSearcher()
-        
         # Test script tag sanitization
         dangerous = "<script>alert('xss')</script>Some content"
         sanitized = searcher.sanitize_content(dangerous)
@@ -56,10 +97,8 @@ class TestWebSearch:
         sanitized = searcher.sanitize_content(dangerous)
         assert "<iframe" not in sanitized
         
-    def test_cache_operations(self):
+    def test_cache_operations(self, searcher):
         """Test cache operations"""
-        searcher = WebSearcher()
-        
         # Create test results
         results = [
             SearchResult("Test 1", "http://test1.com", "Snippet 1"),
@@ -80,77 +119,58 @@ class TestWebSearch:
         searcher.clear_cache()
         assert searcher._get_from_cache(key) is None
         
-    def test_actual_search(self):
-        """Test web search with mocked responses"""
-        searcher = WebSearcher()
-        
-        # Mock the search results
-        mock_results = [
-            SearchResult(
-                title="Python Programming Tutorial",
-                url="https://example.com/python",
-                snippet="Learn Python programming from scratch"
-            ),
-            SearchResult(
-                title="Advanced Python Techniques",
-                url="https://example.com/advanced-python",
-                snippet="Master advanced Python concepts"
-            )
-        ]
+    def test_cache_expiry(self):
+        """Test that expired cache entries are dropped"""
+        searcher = WebSearcher(cache_ttl_minutes=0)
+        
+        searcher._add_to_cache("test_key", [SearchResult("Test", "http://test.com", "Snippet")])
         
-        # Store in cache to simulate search results
-        cache_key = searcher._get_cache_key("Python programming", 3)
-        searcher.cache[cache_key] = {
-            'results': mock_results,
-            'timestamp': datetime.now()
-        }
+        assert searcher._get_from_cache("test_key") is None
+        assert "test_key" not in searcher.cache
         
-        # Now search should return cached results
-        results = searcher.search("Python programming", num_results=3)
+    def test_cache_eviction(self):
+        """Test that the least recently used entry is evicted when the cache is full"""
+        searcher = WebSearcher(max_cache_size=2)
+        
+        searcher._add_to_cache("a", [])
+        searcher._add_to_cache("b", [])
+        searcher._get_from_cache("a")  # "b" is now least recently used
+        searcher._add_to_cache("c", [])
+        
+        assert list(searcher.cache) == ["a", "c"]
+        
+    def test_actual_search(self, searcher):
+        """Test web search against a canned DuckDuckGo results page"""
+        with patch.object(searcher.session, 'get', return_value=_html_response(SERP_HTML)) as mock_get:
+            results = searcher.search("Python programming", num_results=3)
+        
+        # The results page was requested once, without any network access
+        mock_get.assert_called_once()
+        assert mock_get.call_args[0][0] == "https://html.duckduckgo.com/html/?q=Python+programming"
         
         assert len(results) == 2
         assert results[0].title == "Python Programming Tutorial"
+        assert results[0].snippet == "Learn Python programming from scratch"
         assert results[1].title == "Advanced Python Techniques"
         for result in results:
             assert result.title
             assert result.url
             assert result.url.startswith("http")
-            
-    def test_content_extraction(self):
-        """Test content extraction with mocked response"""
-        searcher = WebSearcher()
-        
-        # Mock the extract_content method
-        test_url = "https://example.com"
-        mock_content = """Example Domain
         
-        This domain is for use in illustrative examples in documents.
-        You may use this domain in literature without prior coordination or asking for permission.
-        
-        More information..."""
-        
-        # Store in cache to simulate extracted content
-        cache_key = f"content_{test_url}"
-        searcher.cache[cache_key] = {
-            'content': mock_content,
-            'timestamp': datetime.now()
-        }
-        
-        # Monkey patch the extract_content method to check cache first
-        original_extract = searcher.extract_content
-        def mock_extract(url):
-            cache_key = f"content_{url}"
-            cached = searcher.cache.get(cache_key)
-            if cached:
-                return cached['content']
-            return original_extract(url)
-        
-        searcher.extract_content = mock_extract
-        
-        # Test extraction
-        content = searcher.extract_content(test_url)
+        # A repeat search is served from the cache
+        with patch.object(searcher.session, 'get') as mock_get:
+            assert searcher.search("Python programming", num_results=3) == results
+        mock_get.assert_not_called()
+            
+    def test_content_extraction(self, searcher):
+        """Test content extraction from a canned page"""
+        with patch.object(searcher.session, 'get', return_value=_html_response(EXAMPLE_HTML)):
+            content = searcher.extract_content("https://example.com")
         
         assert content is not None
         assert len(content) > 0
         assert "Example Domain" in content
-        assert "illustrative examples" in content
\ No newline at end of file
+        assert "illustrative examples" in content
+        # Scripts and styles are stripped
+        assert "tracker" not in content
+        assert "font-family" not in content
@@ -4,7 +4,7 @@ Quick fix for deepseek model compatibility issue
 This script patches the model parameters to work with deepseek
 """
 
-import json
+import orjson
 import os
 
 def create_model_config():
@@ -57,12 +57,12 @@ def create_model_config():
     
     # Save to src directory
     config_path = os.path.join("src", "model_config.json")
-    with open(config_path, "w") as f:
-        json.dump(config, f, indent=2)
+    with open(config_path, "wb") as f:
+        f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
     
     print(f"✅ Created model configuration at {config_path}")
     print("\nDeepseek model configuration:")
-    print(json.dumps(config["model_parameters"]["deepseek"], indent=2))
+    print(orjson.dumps(config["model_parameters"]["deepseek"], option=orjson.OPT_INDENT_2).decode())
     print("\n⚠️  Note: Deepseek will use minimal parameters to avoid 422 errors")
 
 def verify_config_loaded():
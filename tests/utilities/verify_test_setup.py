@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 
 # Add project root to path
-project_root = Path(__file__).parent.parent
+project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 print("🔍 Verifying Test Setup")
@@ -30,41 +30,40 @@ for test_name, import_stmt in tests_to_verify:
 print("\n📦 Checking Required Packages")
 print("-" * 60)
 
+# (package, top-level module) pairs
 required_packages = [
-    "pytest",
-    "playwright", 
-    "beautifulsoup4",
-    "requests",
-    "psutil",
-    "streamlit",
-    "fastapi",
-    "langchain",
-    "faiss",
+    ("pytest", "pytest"),
+    ("playwright", "playwright"),
+    ("beautifulsoup4", "bs4"),
+    ("requests", "requests"),
+    ("psutil", "psutil"),
+    ("streamlit", "streamlit"),
+    ("fastapi", "fastapi"),
+    ("langchain", "langchain"),
+    ("faiss", "faiss"),
 ]
 
-import importlib
-for package in required_packages:
-    try:
-        importlib.import_module(package.replace("-", "_"))
+# Locating a package is enough to know it's installed; importing it is not needed
+import importlib.util
+for package, module in required_packages:
+    if importlib.util.find_spec(module) is not None:
         print(f"✅ {package}: Installed")
-    except ImportError:
+    else:
         print(f"❌ {package}: NOT INSTALLED")
 
 # Check services
 print("\n🔧 Checking Services")
 print("-" * 60)
 
-import subprocess
-
-# Check Ollama
+# Check Ollama (talks to the daemon directly rather than spawning the CLI)
 try:
-    result = subprocess.run(["ollama", "list"], capture_output=True)
-    if result.returncode == 0:
-        print("✅ Ollama: Available")
-    else:
-        print("❌ Ollama: Not running")
-except FileNotFoundError:
-    print("❌ Ollama: Not installed")
+    import ollama
+    ollama.list()
+    print("✅ Ollama: Available")
+except ImportError:
+    print("❌ Ollama: Python client not installed")
+except Exception:
+    print("❌ Ollama: Not running")
 
 # Check if API can start
 print("\n✅ Test setup verification complete!")
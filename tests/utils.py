@@ -1,8 +1,20 @@
 """
 Shared utilities for test scripts
 """
+import os
 import ollama
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Optional
+
+# Optional simsimd import for brute-force searches in batch_similarity_search
+try:
+    import simsimd
+    HAS_SIMSIMD = True
+except ImportError:
+    HAS_SIMSIMD = False
+
+# Set GREG_TEST_FAST=1 to rank test queries with SimSIMD kernels instead of FAISS
+USE_SIMSIMD_SEARCH = HAS_SIMSIMD and os.getenv("GREG_TEST_FAST", "").lower() in ("1", "true", "yes")
 
 # Model name mappings from short names to full names with tags
 MODEL_MAPPINGS = {
@@ -25,43 +37,43 @@ def get_model_full_name(model_short_name: str) -> str:
     
     return MODEL_MAPPINGS.get(model_short_name, model_short_name)
 
+# Reverse of MODEL_MAPPINGS, for mapping installed models back to short names
+MODEL_SHORT_NAMES = {full_name: short_name for short_name, full_name in MODEL_MAPPINGS.items()}
+
+@lru_cache(maxsize=1)
+def _list_models() -> tuple:
+    """Fetch installed models from Ollama once per process (errors are not cached)"""
+    model_list = []
+    for model in ollama.list()['models']:
+        full_name = model['name']
+        
+        # Known models (exact tag, or any tag of a known base name) use their short name
+        short_name = MODEL_SHORT_NAMES.get(full_name)
+        if short_name is None:
+            base_name = full_name.split(':', 1)[0]
+            short_name = base_name if ':' in full_name and base_name in MODEL_MAPPINGS else full_name
+        model_list.append(short_name)
+    
+    # Remove duplicates while preserving order
+    return tuple(dict.fromkeys(model_list))
+
 def get_available_models() -> List[str]:
     """
     Get list of available models from Ollama.
     Returns short names for known models, full names for others.
+    The Ollama query is made once per process; call
+    clear_model_cache() after pulling or removing models.
     """
     try:
-        models = ollama.list()
-        model_list = []
-        
-        for model in models['models']:
-            full_name = model['name']
-            
-            # Check if this matches any of our known models
-            added = False
-            for short_name, mapped_name in MODEL_MAPPINGS.items():
-                if full_name == mapped_name or full_name.startswith(short_name + ':'):
-                    model_list.append(short_name)
-                    added = True
-                    break
-            
-            # If not a known model, add the full name
-            if not added:
-                model_list.append(full_name)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_models = []
-        for model in model_list:
-            if model not in seen:
-                seen.add(model)
-                unique_models.append(model)
-        
-        return unique_models
+        return list(_list_models())
     except Exception as e:
         print(f"Error getting models: {e}")
         return []
 
+def clear_model_cache() -> None:
+    """Forget the cached Ollama model list so the next call queries Ollama again"""
+    _list_models.cache_clear()
+
 def parse_model_list(models_arg: Optional[List[str]]) -> List[str]:
     """
     Parse model list from command line arguments.
@@ -70,4 +82,50 @@ def parse_model_list(models_arg: Optional[List[str]]) -> List[str]:
     if not models_arg:
         return None
     
-    return [get_model_full_name(model) for model in models_arg]
\ No newline at end of file
+    return [get_model_full_name(model) for model in models_arg]
+
+def batch_similarity_search(vector_store, queries: List[str], k: int = 4) -> List[list]:
+    """
+    Run several similarity searches against a FAISS store as one batched query.
+    Embeds each query with embed_query, as similarity_search does, and searches
+    the index with the whole (n, d) matrix, returning the matching documents for
+    each query.
+    """
+    import faiss
+    import numpy as np
+    
+    embeddings = np.asarray(
+        [vector_store.embeddings.embed_query(query) for query in queries], dtype='float32'
+    )
+    
+    if USE_SIMSIMD_SEARCH and vector_store.index.metric_type == faiss.METRIC_L2:
+        ids = _simsimd_search(vector_store.index, embeddings, k)
+    else:
+        _, ids = vector_store.index.search(embeddings, k)
+    
+    return [
+        [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            for i in row if i != -1
+        ]
+        for row in ids
+    ]
+
+def _simsimd_search(index, queries: "np.ndarray", k: int) -> "np.ndarray":
+    """
+    Exact top-k ids by squared L2 distance, matching FAISS's flat L2 index, using
+    SimSIMD's vectorised cdist over the stored vectors. Test stores hold at most a
+    few hundred chunks, so brute force beats FAISS's per-call overhead.
+    """
+    import numpy as np
+    
+    k = min(k, index.ntotal)
+    if k == 0:
+        return np.empty((len(queries), 0), dtype='int64')
+    
+    vectors = index.reconstruct_n(0, index.ntotal)
+    distances = np.asarray(simsimd.cdist(queries, vectors, metric='sqeuclidean'))
+    
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
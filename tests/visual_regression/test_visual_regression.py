@@ -5,9 +5,12 @@ import os
 import sys
 import time
 import asyncio
+import filecmp
+import struct
 from pathlib import Path
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -19,12 +22,40 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("⚠️  Playwright not installed. Install with: pip install playwright && playwright install chromium")
 
+# Optional perceptual hashing for screenshot comparison (falls back to file sizes)
+try:
+    import imagehash
+    from PIL import Image
+    IMAGEHASH_AVAILABLE = True
+except ImportError:
+    IMAGEHASH_AVAILABLE = False
+
 
 class VisualRegressionTester:
     """Visual regression testing for Streamlit app"""
     
-    def __init__(self):
+    # (state, viewport) cells captured by default; the rest repeat these layouts
+    CAPTURE_MATRIX = [
+        ("initial_state", "desktop"),
+        ("initial_state", "mobile"),
+        ("with_notification", "desktop"),
+        ("sidebar_expanded", "laptop"),
+        ("chat_input", "desktop"),
+        ("chat_input", "mobile"),
+        ("error_state", "desktop"),
+    ]
+    
+    def __init__(self, cdp_endpoint: Optional[str] = None, fast: bool = False, full: bool = False):
         self.app_url = "http://localhost:2402"
+        # Attach to an already running Chromium instead of launching one per run
+        self.cdp_endpoint = cdp_endpoint
+        # Capture every state at every viewport instead of CAPTURE_MATRIX
+        self.full = full
+        # Capture comparison runs at half resolution; pHash downsizes to 32x32 anyway,
+        # but file sizes are only comparable at the baseline's resolution
+        self.fast = fast and IMAGEHASH_AVAILABLE
+        if fast and not IMAGEHASH_AVAILABLE:
+            print("⚠️  --fast needs imagehash (pip install imagehash), capturing at full resolution")
         self.screenshots_dir = Path("tests/visual_regression/screenshots")
         self.baseline_dir = self.screenshots_dir / "baseline"
         self.current_dir = self.screenshots_dir / "current"
@@ -40,14 +71,36 @@ class VisualRegressionTester:
             {"width": 768, "height": 1024, "name": "tablet"},
             {"width": 375, "height": 812, "name": "mobile"}
         ]
+        
+        # Viewports captured at the same time
+        self.max_parallel_viewports = 2
+        
+        # Screenshots whose perceptual hashes differ in more bits than this fail
+        self.phash_threshold = 5
+        self.baseline_hashes_file = self.baseline_dir / "hashes.json"
+        
+        # Skip Chromium services screenshots don't need, and render at 1x so
+        # captures match across HiDPI and regular displays
+        self.browser_args = [
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-renderer-backgrounding",
+            "--disable-features=TranslateUI",
+            "--mute-audio",
+            "--force-device-scale-factor=1",
+        ]
     
     async def setup_browser(self) -> tuple:
-        """Setup browser and page"""
+        """Launch the browser once; each viewport gets its own context"""
         playwright = await async_playwright().start()
-        browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-        return playwright, browser, page
+        if self.cdp_endpoint:
+            # close() later only disconnects, leaving the browser warm for the next run
+            browser = await playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+        else:
+            browser = await playwright.chromium.launch(headless=True, args=self.browser_args)
+        return playwright, browser
     
     async def wait_for_app_ready(self, page: Page) -> None:
         """Wait for Streamlit app to be ready"""
@@ -59,83 +112,138 @@ class VisualRegressionTester:
         # Wait for header to be visible
         await page.wait_for_selector('h1:has-text("Greg - AI Playground")', timeout=10000)
         
-        # Wait a bit more for dynamic content
-        await asyncio.sleep(2)
+        # Wait for remaining dynamic content to finish loading
+        await page.wait_for_load_state("networkidle", timeout=10000)
     
-    async def capture_screenshot(self, page: Page, name: str, viewport: Dict[str, Any], is_baseline: bool = False) -> str:
-        """Capture a screenshot"""
-        # Set viewport
-        await page.set_viewport_size({"width": viewport["width"], "height": viewport["height"]})
-        await asyncio.sleep(1)  # Wait for resize
-        
+    async def capture_screenshot(self, page: Page, name: str, viewport: Dict[str, Any], is_baseline: bool = False,
+                                 full_page: bool = False) -> str:
+        """Capture a screenshot of the viewport, or of the whole scrollable page"""
         # Determine path
         dir_path = self.baseline_dir if is_baseline else self.current_dir
         filename = f"{name}_{viewport['name']}.png"
         filepath = dir_path / filename
         
-        # Capture screenshot
-        await page.screenshot(path=str(filepath), full_page=True)
+        # Capture screenshot; frozen animations and a hidden caret keep captures stable.
+        # Fast captures keep the context's 0.5 device scale, everything else is 1x
+        fast_capture = self.fast and not is_baseline
+        png_bytes = await page.screenshot(full_page=full_page, animations="disabled", caret="hide",
+                                          scale="device" if fast_capture else "css")
+        if fast_capture:
+            self._check_half_resolution(png_bytes, viewport, full_page)
+        
+        # Write from a thread so disk I/O doesn't stall the loop driving the other viewports
+        await asyncio.get_running_loop().run_in_executor(None, filepath.write_bytes, png_bytes)
         
         return str(filepath)
     
-    async def capture_ui_states(self, page: Page, is_baseline: bool = False) -> List[Dict[str, str]]:
-        """Capture screenshots of different UI states"""
+    def _check_half_resolution(self, png_bytes: bytes, viewport: Dict[str, Any], full_page: bool) -> None:
+        """Make sure a --fast capture really came out at half the viewport size"""
+        # Width and height sit in the PNG's IHDR chunk, so no decode is needed
+        width, height = struct.unpack(">II", png_bytes[16:24])
+        expected = [(width, viewport["width"] / 2)]
+        if not full_page:
+            expected.append((height, viewport["height"] / 2))
+        
+        if any(abs(actual - target) > 1 for actual, target in expected):
+            raise RuntimeError(
+                f"--fast capture for {viewport['name']} is {width}x{height}, expected half of "
+                f"{viewport['width']}x{viewport['height']}"
+            )
+    
+    async def capture_ui_states(self, browser: Browser, is_baseline: bool = False) -> List[Dict[str, str]]:
+        """Capture screenshots of different UI states, for all viewports concurrently"""
+        # Contexts are isolated, so viewports can be driven in parallel; the cap keeps
+        # the Streamlit server and the browser's screenshot pipeline from being swamped
+        semaphore = asyncio.Semaphore(self.max_parallel_viewports)
+        per_viewport = await asyncio.gather(*[
+            self._capture_viewport(browser, viewport, semaphore, is_baseline)
+            for viewport in self.viewport_sizes
+            if self._states_for(viewport)
+        ])
+        return [screenshot for screenshots in per_viewport for screenshot in screenshots]
+    
+    def _states_for(self, viewport: Dict[str, Any]) -> set:
+        """UI states to capture at this viewport"""
+        if self.full:
+            return {"initial_state", "with_notification", "sidebar_expanded", "chat_input", "error_state"}
+        return {state for state, viewport_name in self.CAPTURE_MATRIX if viewport_name == viewport["name"]}
+    
+    async def _capture_viewport(self, browser: Browser, viewport: Dict[str, Any],
+                                semaphore: asyncio.Semaphore, is_baseline: bool) -> List[Dict[str, str]]:
+        """Capture the selected UI states at one viewport size
+        
+        States build on each other, so every step still runs; only the screenshots are skipped.
+        """
         screenshots = []
+        states = self._states_for(viewport)
         
-        for viewport in self.viewport_sizes:
+        async with semaphore:
             print(f"📸 Capturing {viewport['name']} viewport...")
             
-            # 1. Initial state
-            await self.wait_for_app_ready(page)
-            path = await self.capture_screenshot(page, "01_initial_state", viewport, is_baseline)
-            screenshots.append({"name": "Initial State", "viewport": viewport['name'], "path": path})
-            
-            # 2. With notification
-            await page.evaluate("""
-                const notification = document.createElement('div');
-                notification.className = 'stSuccess';
-                notification.textContent = '✅ Test notification';
-                document.querySelector('[data-testid="stApp"]').appendChild(notification);
-            """)
-            await asyncio.sleep(0.5)
-            path = await self.capture_screenshot(page, "02_with_notification", viewport, is_baseline)
-            screenshots.append({"name": "With Notification", "viewport": viewport['name'], "path": path})
-            
-            # 3. Sidebar expanded
+            # A fresh context per viewport starts at the right size with clean state
+            context = await browser.new_context(
+                viewport={"width": viewport["width"], "height": viewport["height"]},
+                device_scale_factor=0.5 if self.fast and not is_baseline else 1
+            )
             try:
-                # Try to expand sidebar
-                sidebar_button = await page.query_selector('button[aria-label="Open sidebar"]')
-                if sidebar_button:
-                    await sidebar_button.click()
-                    await asyncio.sleep(1)
-                    path = await self.capture_screenshot(page, "03_sidebar_expanded", viewport, is_baseline)
-                    screenshots.append({"name": "Sidebar Expanded", "viewport": viewport['name'], "path": path})
-            except:
-                print(f"⚠️  Could not expand sidebar for {viewport['name']}")
-            
-            # 4. Chat interface (if document loaded)
-            chat_input = await page.query_selector('textarea[placeholder*="Ask about"]')
-            if chat_input:
-                await chat_input.fill("Test question")
-                await asyncio.sleep(0.5)
-                path = await self.capture_screenshot(page, "04_chat_input", viewport, is_baseline)
-                screenshots.append({"name": "Chat Input", "viewport": viewport['name'], "path": path})
-            
-            # 5. Error state simulation
-            await page.evaluate("""
-                const error = document.createElement('div');
-                error.className = 'stAlert';
-                error.innerHTML = '<div style="color: red;">❌ Simulated error message</div>';
-                document.querySelector('[data-testid="stApp"]').appendChild(error);
-            """)
-            await asyncio.sleep(0.5)
-            path = await self.capture_screenshot(page, "05_error_state", viewport, is_baseline)
-            screenshots.append({"name": "Error State", "viewport": viewport['name'], "path": path})
+                page = await context.new_page()
+                
+                # 1. Initial state
+                await self.wait_for_app_ready(page)
+                if "initial_state" in states:
+                    path = await self.capture_screenshot(page, "01_initial_state", viewport, is_baseline, full_page=True)
+                    screenshots.append({"name": "Initial State", "viewport": viewport['name'], "path": path})
+                
+                # 2. With notification
+                await page.evaluate("""
+                    const notification = document.createElement('div');
+                    notification.className = 'stSuccess';
+                    notification.textContent = '✅ Test notification';
+                    document.querySelector('[data-testid="stApp"]').appendChild(notification);
+                """)
+                await page.wait_for_selector('div.stSuccess', state="visible")
+                if "with_notification" in states:
+                    path = await self.capture_screenshot(page, "02_with_notification", viewport, is_baseline)
+                    screenshots.append({"name": "With Notification", "viewport": viewport['name'], "path": path})
+                
+                # 3. Sidebar expanded
+                try:
+                    # Try to expand sidebar
+                    sidebar_button = await page.query_selector('button[aria-label="Open sidebar"]')
+                    if sidebar_button:
+                        await sidebar_button.click()
+                        await page.wait_for_selector('[data-testid="stSidebar"][aria-expanded="true"]', timeout=5000)
+                        if "sidebar_expanded" in states:
+                            path = await self.capture_screenshot(page, "03_sidebar_expanded", viewport, is_baseline)
+                            screenshots.append({"name": "Sidebar Expanded", "viewport": viewport['name'], "path": path})
+                except:
+                    print(f"⚠️  Could not expand sidebar for {viewport['name']}")
+                
+                # 4. Chat interface (if document loaded)
+                chat_input = await page.query_selector('textarea[placeholder*="Ask about"]')
+                if chat_input:
+                    await chat_input.fill("Test question")
+                    if "chat_input" in states:
+                        path = await self.capture_screenshot(page, "04_chat_input", viewport, is_baseline)
+                        screenshots.append({"name": "Chat Input", "viewport": viewport['name'], "path": path})
+                
+                # 5. Error state simulation
+                await page.evaluate("""
+                    const error = document.createElement('div');
+                    error.className = 'stAlert';
+                    error.innerHTML = '<div style="color: red;">❌ Simulated error message</div>';
+                    document.querySelector('[data-testid="stApp"]').appendChild(error);
+                """)
+                await page.wait_for_selector('div.stAlert', state="visible")
+                if "error_state" in states:
+                    path = await self.capture_screenshot(page, "05_error_state", viewport, is_baseline)
+                    screenshots.append({"name": "Error State", "viewport": viewport['name'], "path": path})
+            finally:
+                # Clean up, even when a wait times out, so contexts don't pile up
+                # in a long-lived browser
+                await context.close()
             
-            # Clean up
-            await page.reload()
-        
-        return screenshots
+            return screenshots
     
     async def compare_screenshots(self) -> Dict[str, Any]:
         """Compare current screenshots with baseline"""
@@ -149,37 +257,99 @@ class VisualRegressionTester:
         
         # Get all current screenshots
         current_files = list(self.current_dir.glob("*.png"))
+        baseline_hashes = self.load_baseline_hashes() if IMAGEHASH_AVAILABLE else {}
+        
+        # Decoding and hashing is CPU-bound in PIL, which releases the GIL
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            comparisons = await asyncio.gather(*[
+                loop.run_in_executor(executor, self._diff_one, current_file, baseline_hashes)
+                for current_file in current_files
+            ])
         
-        for current_file in current_files:
+        for comparison in comparisons:
             results["total"] += 1
-            baseline_file = self.baseline_dir / current_file.name
-            
-            if not baseline_file.exists():
-                results["missing_baseline"] += 1
-                results["differences"].append({
-                    "file": current_file.name,
-                    "status": "missing_baseline"
-                })
+            if comparison is None:
+                results["passed"] += 1
                 continue
             
-            # Simple file size comparison (more sophisticated comparison would use image diff libraries)
-            current_size = current_file.stat().st_size
-            baseline_size = baseline_file.stat().st_size
-            
-            # Allow 5% difference in file size
-            size_diff_percent = abs(current_size - baseline_size) / baseline_size * 100
-            
-            if size_diff_percent > 5:
+            if comparison["status"] == "missing_baseline":
+                results["missing_baseline"] += 1
+            else:
                 results["failed"] += 1
-                results["differences"].append({
+            results["differences"].append(comparison)
+        
+        return results
+    
+    def _diff_one(self, current_file: Path, baseline_hashes: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Compare one screenshot with its baseline; None when they match"""
+        baseline_file = self.baseline_dir / current_file.name
+        
+        if not baseline_file.exists():
+            return {
+                "file": current_file.name,
+                "status": "missing_baseline"
+            }
+        
+        # Byte-identical captures match without decoding either image
+        if filecmp.cmp(current_file, baseline_file, shallow=False):
+            return None
+        
+        if IMAGEHASH_AVAILABLE:
+            # Perceptual hashes ignore PNG recompression noise but catch real pixel changes
+            if current_file.name in baseline_hashes:
+                baseline_hash = imagehash.hex_to_hash(baseline_hashes[current_file.name])
+            else:
+                # Baseline created before hashes.json existed
+                baseline_hash = self._phash(baseline_file)
+            hash_distance = int(self._phash(current_file) - baseline_hash)
+            
+            if hash_distance > self.phash_threshold:
+                return {
                     "file": current_file.name,
                     "status": "different",
-                    "size_diff_percent": size_diff_percent
-                })
-            else:
-                results["passed"] += 1
+                    "hash_distance": hash_distance
+                }
+            return None
         
-        return results
+        # Simple file size comparison when imagehash isn't installed
+        current_size = current_file.stat().st_size
+        baseline_size = baseline_file.stat().st_size
+        
+        # Allow 5% difference in file size
+        size_diff_percent = abs(current_size - baseline_size) / baseline_size * 100
+        
+        if size_diff_percent > 5:
+            return {
+                "file": current_file.name,
+                "status": "different",
+                "size_diff_percent": size_diff_percent
+            }
+        return None
+    
+    def _phash(self, image_path: Path) -> "imagehash.ImageHash":
+        """Perceptual hash of a screenshot"""
+        with Image.open(image_path) as image:
+            return imagehash.phash(image)
+    
+    def save_baseline_hashes(self) -> None:
+        """Write the pHash of every baseline screenshot to baseline/hashes.json
+        
+        Comparison runs then only decode the current screenshots.
+        """
+        hashes = {
+            baseline_file.name: str(self._phash(baseline_file))
+            for baseline_file in sorted(self.baseline_dir.glob("*.png"))
+        }
+        with open(self.baseline_hashes_file, 'wb') as f:
+            f.write(orjson.dumps(hashes, option=orjson.OPT_INDENT_2))
+    
+    def load_baseline_hashes(self) -> Dict[str, str]:
+        """Baseline pHashes saved with the baseline, keyed by filename"""
+        if not self.baseline_hashes_file.exists():
+            return {}
+        with open(self.baseline_hashes_file, 'rb') as f:
+            return orjson.loads(f.read())
     
     async def run_tests(self, create_baseline: bool = False) -> None:
         """Run visual regression tests"""
@@ -190,19 +360,27 @@ class VisualRegressionTester:
         print(f"🎨 Running Visual Regression Tests {'(Creating Baseline)' if create_baseline else ''}")
         print(f"📍 App URL: {self.app_url}")
         
-        playwright, browser, page = await self.setup_browser()
+        playwright, browser = await self.setup_browser()
         
         try:
             # Check if app is running
+            page = await browser.new_page()
             try:
                 await page.goto(self.app_url, timeout=5000)
             except:
                 print("❌ Streamlit app not running at http://localhost:2402")
                 print("   Start it with: streamlit run app.py")
                 return
+            finally:
+                await page.close()
+            
+            # Drop screenshots from earlier runs, which may have covered other cells
+            if not create_baseline:
+                for stale_file in self.current_dir.glob("*.png"):
+                    stale_file.unlink()
             
             # Capture screenshots
-            screenshots = await self.capture_ui_states(page, is_baseline=create_baseline)
+            screenshots = await self.capture_ui_states(browser, is_baseline=create_baseline)
             
             print(f"\n✅ Captured {len(screenshots)} screenshots")
             
@@ -223,17 +401,21 @@ class VisualRegressionTester:
                         print(f"   - {diff['file']}: {diff['status']}")
                         if 'size_diff_percent' in diff:
                             print(f"     Size difference: {diff['size_diff_percent']:.1f}%")
+                        if 'hash_distance' in diff:
+                            print(f"     Perceptual hash distance: {diff['hash_distance']} bits")
                 
                 # Save results
                 results_file = self.screenshots_dir / "results.json"
-                with open(results_file, 'w') as f:
-                    json.dump(results, f, indent=2)
+                with open(results_file, 'wb') as f:
+                    f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
                 
                 if results['failed'] > 0:
                     print("\n❌ Visual regression tests failed!")
                 else:
                     print("\n✅ All visual regression tests passed!")
             else:
+                if IMAGEHASH_AVAILABLE:
+                    self.save_baseline_hashes()
                 print("\n✅ Baseline screenshots created successfully!")
                 print(f"   Saved to: {self.baseline_dir}")
         
@@ -249,9 +431,16 @@ async def main():
     parser = argparse.ArgumentParser(description="Visual Regression Testing")
     parser.add_argument("--create-baseline", action="store_true", 
                        help="Create baseline screenshots")
+    parser.add_argument("--cdp-endpoint", default=os.getenv("VISUAL_REGRESSION_CDP_ENDPOINT"),
+                       help="Reuse a running Chromium, e.g. http://localhost:9222 "
+                            "(start it with --remote-debugging-port=9222)")
+    parser.add_argument("--fast", action="store_true",
+                       help="Capture comparison screenshots at half resolution (requires imagehash)")
+    parser.add_argument("--full", action="store_true",
+                       help="Capture every UI state at every viewport (e.g. before a release)")
     args = parser.parse_args()
     
-    tester = VisualRegressionTester()
+    tester = VisualRegressionTester(cdp_endpoint=args.cdp_endpoint, fast=args.fast, full=args.full)
     await tester.run_tests(create_baseline=args.create_baseline)
 
 